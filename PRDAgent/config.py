@@ -14,6 +14,11 @@ GROQ_MODEL = "llama-3.1-8b-instant"  # Primary model - fast and reliable
 # GROQ_MODEL = "gemma-7b-it"  # Gemma alternative
 GROQ_MAX_TOKENS = 8192
 GROQ_TEMPERATURE = 0.1
+GROQ_MAX_CONNECTIONS = 32  # Shared HTTP/2 connection pool size
+GROQ_MAX_CONCURRENT = 8  # Groq requests allowed in flight at once
+GROQ_RATE_LIMIT_RETRIES = 4  # Backoff retries on HTTP 429 before giving up
+GROQ_RATE_LIMIT_MIN_REMAINING = 2  # Pause new requests when this few remain in the rate limit window
+GROQ_RATE_LIMIT_MAX_WAIT = 30  # Upper bound in seconds for any rate limit wait
 
 ## CIRCLES Framework Configuration
 CIRCLES_STEPS = [
@@ -25,13 +30,27 @@ CIRCLES_STEPS = [
     "evaluate_trade_offs",
     "summarize_recommendations"
 ]
+CIRCLES_BATCHED_EXECUTION = True  # Run all steps in one JSON Groq call, per-step calls as fallback
+CIRCLES_STEP_TOKEN_BUDGET = 400  # Response budget hinted to each step, scaled up for longer product context
+
+## Response Budget Hints
+ENABLE_TOKEN_BUDGET_HINTS = True  # Tell the model how many tokens its response may use
 
 ## Template Configuration
 PRD_TEMPLATE_FILE = "prd_template.prompt"
 SYSTEM_PROMPT_FILE = "prd_system_prompt.prompt"
 
+## Response Cache Configuration
+ENABLE_LLM_CACHE = True
+LLM_CACHE_DIR = "cache/prd_llm"  # Relative to the PRDAgent directory
+LLM_CACHE_MAX_ENTRIES = 2000  # Oldest cached responses are dropped beyond this
+
 ## Memory Configuration (Optional for hackathon)
 SESSION_EXPIRY_DAYS = 7
+SESSION_STORE_BACKEND = "memory"  # "memory" or "redis"
+REDIS_URL = "redis://localhost:6379/0"
+SESSION_EVICTION_INTERVAL_SECONDS = 300
+MAX_STORED_SESSIONS = 1024  # In-memory backend drops the least recently used session beyond this
 
 ## Performance Settings
 MAX_CONCURRENT_SESSIONS = 50
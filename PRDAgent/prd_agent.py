@@ -1,18 +1,398 @@
-import json
 import logging
 import os
+import re
+import sys
 import asyncio
+import copy
+import hashlib
+import random
+import time
 import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from itertools import chain, islice
+from types import MappingProxyType
 import traceback
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from typing import AsyncIterator, Iterator, Dict, Any, Optional, List, Pattern, Set, Tuple, Union
 from pydantic import BaseModel
 import httpx
-from groq import Groq
-from utils.prompt_loader import load_prompt
+from groq import AsyncGroq, AsyncStream, RateLimitError
+from utils.prompt_loader import load_prompt, CompiledPrompt
 from utils.template_manager import get_template_manager
+from utils.response_cache import ResponseCache
+from utils.session_store import SessionStore, InMemorySessionStore, RedisSessionStore
+from utils.token_counter import count_tokens, truncate_to_tokens
+from utils import fast_json
 import config
 
+# Bullet, numbered (1.-19.) and key-phrase line detection for response summarization
+_BULLET_RE = re.compile(r'^(?:- |\* |•|(?:1[0-9]|[1-9])\.)')
+_KEYWORDS_RE = re.compile(r'key|important|primary|main|critical', re.IGNORECASE)
+
+# Lines that may be bullets or key phrases, found across a whole response in one scan;
+# a superset of the exact per-line checks above, which confirm each candidate
+_KEY_LINE_CANDIDATE_RE = re.compile(
+    r'^[^\S\n]*(?:- |\* |•|1[0-9]\.|[1-9]\.|[^\n]*?(?:key|important|primary|main|critical))[^\n]*',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Groq rate limit reset durations such as "2m59.56s" or "450ms"
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+# Session metadata placeholders the model may leave in a generated PRD
+_METADATA_PLACEHOLDER_RE = re.compile(r"\{(generation_date|session_id|document_version)\}")
+_ATTACHMENTS_HEADING = "## 📎 Attachments"
+
+# List item prefixes and marker characters for feature extraction in the table generators
+_LIST_ITEM_PREFIXES = ('-', '*', '•') + tuple(f'{i}.' for i in range(1, 20))
+_FEATURE_ITEM_PREFIXES = _LIST_ITEM_PREFIXES + ('○', '▪', '▫')
+_LIST_MARKER_CHARS = '-*•0123456789. '
+_FEATURE_MARKER_CHARS = '-*•○▪▫0123456789. '
+_FEATURE_HINT_WORDS = ('feature', 'capability', 'function')
+
+# Fixed content of the generated tables: the fallback requirement row, default stakeholder rows
+# (name, role, influence, interest, frequency, concerns), and the per-rank values and
+# fallback features for prioritization
+_DEFAULT_STAKEHOLDERS = (
+    ('Product Owner', 'Business Lead', 'High', 'High', 'Daily', 'Business outcomes'),
+    ('End Users', 'Primary Users', 'Medium', 'High', 'As needed', 'Usability & value'),
+    ('Development Team', 'Implementation', 'High', 'Medium', 'Daily', 'Technical feasibility'),
+    ('Executive Sponsor', 'Decision Maker', 'High', 'Medium', 'Weekly', 'ROI & timeline')
+)
+_DEFAULT_REQUIREMENT_ROW = (
+    "| REQ-001 | Core | Yes | Must Have | Core product functionality | As a user, I want essential features | "
+    "Given core functionality, when I use the system, then it meets my basic needs | Engineering | QA | Medium |"
+)
+_DEFAULT_STAKEHOLDER_TABLE = '\n'.join(f"| {' | '.join(stakeholder)} |" for stakeholder in _DEFAULT_STAKEHOLDERS)
+_PRIORITIZATION_VALUES = ('High', 'High', 'Medium', 'Medium', 'Low')
+_PRIORITIZATION_PHASES = ('MVP', 'MVP', 'Phase 1', 'Phase 1', 'Phase 2')
+_DEFAULT_PRIORITIZATION_FEATURES = (
+    'Core functionality implementation',
+    'User authentication and access',
+    'Data management and storage',
+    'User interface and experience',
+    'Integration capabilities'
+)
+
+# Action words that suggest default features, in the order the features are listed
+_FEATURE_ACTION_WORDS = (
+    'create', 'manage', 'view', 'edit', 'delete', 'search', 'filter', 'sort',
+    'export', 'import', 'configure', 'monitor', 'track', 'analyze', 'report'
+)
+_FEATURE_ACTION_WORD_SET = frozenset(_FEATURE_ACTION_WORDS)
+
+# Context phrases that select the default personas, matched as substrings of the lowercased text
+_BUSINESS_CONTEXT_WORDS = ('enterprise', 'business', 'corporate', 'organization')
+_CUSTOMER_CONTEXT_WORDS = ('customer', 'client', 'external', 'public')
+_TECHNICAL_CONTEXT_WORDS = ('technical', 'developer', 'system')
+
+# Lines that may be feature list items, found across a whole text in one scan;
+# a superset of the exact per-line prefix and hint word checks, which confirm each candidate
+_FEATURE_LINE_CANDIDATE_RE = re.compile(
+    r'^[^\S\n]*(?:[-*•○▪▫]|1[0-9]\.|[1-9]\.|[^\n]*?(?:feature|capability|function))[^\n]*',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Persona detection terms, matched as whole words (or adjacent word pairs) against _line_terms
+_WORD_RE = re.compile(r'[a-z]+')
+_PERSONA_START_TERMS = frozenset({
+    'persona', 'user type', 'customer segment', 'target user', 'primary user', 'secondary user',
+    'manager', 'administrator', 'analyst', 'developer', 'executive', 'employee', 'customer', 'client'
+})
+
+# Persona attributes in priority order: the field each fills, its length limit and its terms
+_PERSONA_ATTRIBUTES = (
+    ('demographics', 50, frozenset({'age', 'demographic', 'background', 'experience'})),
+    ('goals', 60, frozenset({'goal', 'objective', 'want', 'need'})),
+    ('pain_points', 60, frozenset({'pain', 'problem', 'challenge', 'frustration'})),
+    ('use_cases', 60, frozenset({'use case', 'scenario', 'workflow', 'task'})),
+    ('metrics', 50, frozenset({'success', 'metric', 'measure', 'kpi'}))
+)
+# Every attribute term mapped to its (priority, field, limit), so one intersection finds all hits
+_PERSONA_ATTRIBUTE_BY_TERM = {
+    term: (priority, field, limit)
+    for priority, (field, limit, terms) in enumerate(_PERSONA_ATTRIBUTES)
+    for term in terms
+}
+_PERSONA_ATTRIBUTE_TERMS = frozenset(_PERSONA_ATTRIBUTE_BY_TERM)
+
+# Attribute placeholders for a newly detected persona, until its own lines fill them in
+_PERSONA_ATTRIBUTE_DEFAULTS = {
+    'demographics': 'Professional user',
+    'goals': 'Achieve efficiency and productivity',
+    'pain_points': 'Current process limitations',
+    'use_cases': 'Daily operational workflows',
+    'metrics': 'Time saved and accuracy improved'
+}
+
+def _line_terms(line_casefolded: str) -> Set[str]:
+    """Words and adjacent word pairs in a case-folded line, plus their forms without a plural 's'"""
+    words = _WORD_RE.findall(line_casefolded)
+    terms = set(words)
+    terms.update(f'{first} {second}' for first, second in zip(words, words[1:]))
+    terms.update([term[:-1] for term in terms if term.endswith('s')])
+    return terms
+
+@lru_cache(maxsize=256)
+def _compile_keyword_regex(keywords: Tuple[str, ...]) -> Pattern:
+    """Compile a case-insensitive alternation of keywords, longest first"""
+    ordered = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(keyword) for keyword in ordered), re.IGNORECASE)
+
+# Header tests for section extraction, as lookaheads over a single line: a leading
+# marker, a trailing colon, or bold/heading markup anywhere in the line
+_ROBUST_HEADER_MARKERS = r'[^\S\n]*[#*•-]|(?=[^\n]*(?:\*\*|##))|(?=[^\n]*:[^\S\n]*$)'
+_SECTION_HEADER_MARKERS = r'(?=[^\n]*(?:\*\*|#))|(?=[^\n]*:[^\S\n]*$)'
+
+# Lines that end a robustly extracted section: bold/heading markup at the very start,
+# or a short (under 50 characters once stripped) line ending in a colon
+_SECTION_BREAK_RE = re.compile(r'^(?:\*\*|#|[^\S\n]*(?:\S[^\n]{0,47})?:[^\S\n]*$)', re.MULTILINE)
+
+@lru_cache(maxsize=32)
+def _section_break_offsets(text: str) -> Tuple[int, ...]:
+    """Return the start offsets of the section break lines in text, in order
+    
+    Insight extraction reads each CIRCLES response several times with different
+    keywords, so the scan is memoized per response text.
+    """
+    return tuple(match.start() for match in _SECTION_BREAK_RE.finditer(text))
+
+@lru_cache(maxsize=256)
+def _compile_header_regex(keyword: str, markers: str) -> Pattern:
+    """Compile a multiline pattern matching whole header lines that contain keyword"""
+    return re.compile(rf'^(?=[^\n]*{re.escape(keyword)})(?:{markers})[^\n]*', re.IGNORECASE | re.MULTILINE)
+
+def _iter_key_lines(text: str) -> Iterator[str]:
+    """Yield the stripped bullet, numbered and key-phrase lines of text in order"""
+    for match in _KEY_LINE_CANDIDATE_RE.finditer(text):
+        line = match.group(0).strip()
+        if _BULLET_RE.match(line) or _KEYWORDS_RE.search(line):
+            yield line
+
+def _iter_feature_lines(text: str) -> Iterator[str]:
+    """Yield the stripped list item and feature hint lines of text in order"""
+    for match in _FEATURE_LINE_CANDIDATE_RE.finditer(text):
+        line = match.group(0).strip()
+        if line.startswith(_FEATURE_ITEM_PREFIXES):
+            yield line
+        else:
+            line_lower = line.lower()
+            if any(word in line_lower for word in _FEATURE_HINT_WORDS):
+                yield line
+
+def _find_keyword_positions(text: str, keywords: Tuple[str, ...]) -> Dict[str, List[int]]:
+    """Map each lowercased keyword found in text to its match offsets, in a single scan
+    
+    The alternation is ordered longest first, so each match is the longest keyword at
+    that position and every shorter keyword starting there is one of its prefixes.
+    """
+    pattern = _compile_keyword_regex(keywords)
+    keywords_lower = {keyword.lower() for keyword in keywords}
+    keywords_by_hit = {}  # Matched text -> the keywords it starts with, resolved once per distinct hit
+    positions = {}
+    position = 0
+    while True:
+        match = pattern.search(text, position)
+        if not match:
+            return positions
+        hit = match.group(0).lower()
+        hit_keywords = keywords_by_hit.get(hit)
+        if hit_keywords is None:
+            hit_keywords = keywords_by_hit[hit] = [keyword for keyword in keywords_lower if hit.startswith(keyword)]
+        for keyword in hit_keywords:
+            positions.setdefault(keyword, []).append(match.start())
+        position = match.start() + 1
+
+def _find_keywords(text: str, keywords: Tuple[str, ...]) -> Set[str]:
+    """Return the lowercased keywords that occur anywhere in text"""
+    return set(_find_keyword_positions(text, keywords))
+
+@lru_cache(maxsize=1)
+def _load_prompt_cache() -> Dict[str, str]:
+    """Load the CIRCLES step, PRD template and system prompts once per process, skipping any that are unavailable"""
+    prompt_names = [f"circles_{step}.prompt" for step in config.CIRCLES_STEPS]
+    prompt_names += [config.PRD_TEMPLATE_FILE, config.SYSTEM_PROMPT_FILE]
+    
+    prompt_cache = {}
+    for name in prompt_names:
+        try:
+            prompt_cache[name] = load_prompt(name)
+        except Exception as e:
+            logging.warning(f"Could not load prompt {name}: {e}")
+    return prompt_cache
+
+@lru_cache(maxsize=1)
+def _compile_prd_template_cached() -> Optional[CompiledPrompt]:
+    """Parse the PRD template once per process, or return None if it could not be loaded"""
+    prd_template = _load_prompt_cache().get(config.PRD_TEMPLATE_FILE)
+    return CompiledPrompt(prd_template) if prd_template is not None else None
+
+@lru_cache(maxsize=1)
+def _load_system_prompt_cached() -> str:
+    """Load the system prompt for PRD generation once per process"""
+    try:
+        return _load_prompt_cache()[config.SYSTEM_PROMPT_FILE]
+    except Exception as e:
+        logging.warning(f"Could not load system prompt: {e}")
+        return """You are an expert Product Requirements Document (PRD) generator agent.
+            
+Your primary responsibility is to help product managers and stakeholders create comprehensive, 
+well-structured Product Requirements Documents using the CIRCLES framework.
+
+**CIRCLES Framework:**
+- **Comprehend** the situation: Understand the context, background, and problem space
+- **Identify** the customer: Define target users, segments, and stakeholders  
+- **Report** the customer's needs: Document functional, non-functional, and business requirements
+- **Cut** through prioritization: Determine what's essential vs. nice-to-have
+- **List** solutions: Brainstorm and document potential approaches
+- **Evaluate** trade-offs: Analyze pros/cons of different solutions
+- **Summarize** recommendations: Provide clear, actionable recommendations
+
+Create comprehensive, professional PRD documents with proper formatting and tables."""
+
+# CIRCLES appendix: the analysis label for each step, and the skeleton the step excerpts are joined into
+_CIRCLES_APPENDIX_STEPS = (
+    ('circles_comprehend_the_situation', 'C - Comprehend the Situation'),
+    ('circles_identify_the_customer', 'I - Identify the Customer'),
+    ('circles_report_the_customers_needs', 'R - Report Customer Needs'),
+    ('circles_cut_through_prioritization', 'C - Cut Through Prioritization'),
+    ('circles_list_solutions', 'L - List Solutions'),
+    ('circles_evaluate_trade_offs', 'E - Evaluate Trade-offs'),
+    ('circles_summarize_recommendations', 'S - Summarize Recommendations')
+)
+_CIRCLES_APPENDIX_TEMPLATE = """
+---
+
+## 📋 Appendix
+
+### A. Complete CIRCLES Framework Analysis
+
+This document was generated using a comprehensive CIRCLES framework methodology with detailed analysis at each step:
+
+{step_analysis}
+### B. Generation Methodology
+- **Framework Used:** CIRCLES (7-step structured analysis)
+- **AI Model:** Groq llama-3.1-8b-instant 
+- **Template:** {template_id}
+- **Generation Method:** Multi-step analysis with context building
+- **Quality Assurance:** Automated CIRCLES coverage analysis
+
+### C. Definitions and Acronyms
+| Term | Definition |
+|------|------------|
+| PRD | Product Requirements Document |
+| CIRCLES | Comprehensive framework: Comprehend, Identify, Report, Cut, List, Evaluate, Summarize |
+| MVP | Minimum Viable Product |
+| UAT | User Acceptance Testing |
+| BRD | Business Requirements Document |
+
+### D. Analysis Quality Metrics
+- **Framework Completeness:** All 7 CIRCLES steps executed
+- **Context Integration:** Previous step insights inform subsequent analysis
+- **Insight Extraction:** Key findings mapped to PRD sections
+- **Template Alignment:** Structured output following business standards
+
+### E. Additional Resources
+- CIRCLES Methodology: Product School Framework
+- Template Documentation: See templates/README.md  
+- Quality Evaluation: 6-criteria assessment system
+- Generation Source: Groq Lightning-Fast AI Platform
+"""
+
+# Descriptor values of the legacy generation prompt that do not depend on the request
+_LEGACY_TEMPLATE_VARIABLES = MappingProxyType({
+    "situation_context": "To be analyzed based on product description",
+    "background_analysis": "Market and competitive analysis needed",
+    "market_context": "Target market to be defined",
+    "business_context": "Business objectives and goals",
+    "technical_context": "Technical requirements and constraints",
+    "intent_statement": "Primary business objectives and user needs",
+    "customer_description": "Target customer segments and personas",
+    "customer_segments": "Primary and secondary user groups",
+    "customer_context": "User scenarios and use cases",
+    "business_goals": "Key business objectives and success metrics",
+    "success_vision": "Long-term vision and outcomes",
+    "functional_requirements": "Core product functionality",
+    "requirements_table_rows": "| Core Feature | Yes | Must Have | Essential functionality | As a user, I want core features | Features work as expected | Engineering | QA |",
+    "non_functional_requirements": "Performance, security, and scalability needs",
+    "performance_requirements": "Speed, reliability, and capacity requirements",
+    "security_requirements": "Data protection and access control",
+    "scalability_requirements": "Growth and expansion capabilities",
+    "optional_features": "Future enhancements and nice-to-have features",
+    "out_of_scope": "Features explicitly not included in current version",
+    "success_metrics": "Key performance indicators and measurement criteria",
+    "acceptance_criteria": "Specific testable requirements",
+    "performance_targets": "Quantifiable performance goals",
+    "implementation_phases": "Development timeline and milestones",
+    "mvp_definition": "Minimum viable product scope",
+    "timeline": "Project schedule and key dates",
+    "resource_requirements": "Team and infrastructure needs",
+    "risk_mitigation": "Identified risks and mitigation strategies",
+    "monitoring_strategy": "Success tracking and performance monitoring",
+    "feedback_mechanisms": "User feedback collection and analysis",
+    "future_enhancements": "Planned future improvements and features",
+    "success_review": "Success criteria evaluation process",
+    "attachments": "Supporting documents and references",
+    "document_status": "Draft - In Review",
+    "document_version": "1.0",
+    "reference_documents_rows": "| 1.0 | Product Specification | TBD | To be defined |"
+})
+
+# Appendix of the legacy generation prompt, formatted with that prompt's template variables
+_LEGACY_APPENDIX_TEMPLATE = """
+---
+
+## 📋 Appendix
+
+### A. CIRCLES Framework Analysis
+This document was generated using the CIRCLES framework methodology:
+
+**Comprehend the Situation:**
+{situation_context}
+
+**Identify the Customer:**
+{customer_description}
+
+**Report Customer Needs:**
+{intent_statement}
+
+**Cut Through Prioritization:**
+{business_goals}
+
+**List Solutions:**
+{functional_requirements}
+
+**Evaluate Trade-offs:**
+{non_functional_requirements}
+
+**Summarize Recommendations:**
+{success_vision}
+
+### B. Template Information
+- **Template Used:** {template_id}
+- **Generation Method:** Groq AI with CIRCLES Framework
+- **Quality Score:** [To be evaluated]
+
+### C. Definitions and Acronyms
+| Term | Definition |
+|------|------------|
+| PRD | Product Requirements Document |
+| CIRCLES | Comprehend, Identify, Report, Cut, List, Evaluate, Summarize |
+| MVP | Minimum Viable Product |
+| UAT | User Acceptance Testing |
+| BRD | Business Requirements Document |
+
+### D. Additional Resources
+- Template Documentation: See templates/README.md
+- CIRCLES Methodology: Product School Framework
+- Quality Evaluation: 6-criteria assessment system
+"""
+
 class PRDResult(BaseModel):
     """Response model for PRD generation"""
     prd_document: str
@@ -20,64 +400,287 @@ class PRDResult(BaseModel):
     generation_timestamp: str
     session_id: str
 
-class PRDSession(BaseModel):
-    """Session data for PRD generation with template support"""
+# Slotted dataclasses need Python 3.10; the Docker image still runs 3.9
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
+class PRDSession:
+    """Session data for PRD generation with template support
+    
+    A plain dataclass rather than a pydantic model: sessions are internal and updated
+    repeatedly with large LLM outputs, so they skip validation entirely.
+    """
     product_idea: str
     started_at: datetime
     template_id: str = "standard_template"
-    conversation_data: Dict[str, Any] = {}
-    responses: Dict[str, str] = {}
+    conversation_data: Dict[str, Any] = field(default_factory=dict)
+    responses: Dict[str, str] = field(default_factory=dict)
     current_step: int = 0
-    circles_analysis: Dict[str, Any] = {}
+    circles_analysis: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of the session"""
+        data = asdict(self)
+        data["started_at"] = self.started_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PRDSession":
+        """Rebuild a session from to_dict output"""
+        return cls(**{**data, "started_at": datetime.fromisoformat(data["started_at"])})
 
 class GroqPRDAgent:
     """Groq-powered PRD Agent for Hackathon"""
     
-    def __init__(self, groq_api_key: str = None):
+    # CIRCLES step prompt names in framework order
+    _CIRCLES_STEPS = tuple(f"circles_{step}" for step in config.CIRCLES_STEPS)
+    
+    # CIRCLES steps that consume insights from the independent first-wave steps
+    _CIRCLES_WAVE_B = (
+        "circles_cut_through_prioritization",
+        "circles_evaluate_trade_offs",
+        "circles_summarize_recommendations"
+    )
+    
+    # Section headings used when feeding CIRCLES responses into the PRD prompt
+    _STEP_NAMES = {
+        "circles_comprehend_the_situation": "🔍 1. Comprehend the Situation",
+        "circles_identify_the_customer": "👥 2. Identify the Customer", 
+        "circles_report_the_customers_needs": "📋 3. Report Customer Needs",
+        "circles_cut_through_prioritization": "🎯 4. Cut Through Prioritization",
+        "circles_list_solutions": "💡 5. List Solutions",
+        "circles_evaluate_trade_offs": "⚖️ 6. Evaluate Trade-offs",
+        "circles_summarize_recommendations": "🏆 7. Summarize Recommendations"
+    }
+    
+    # Which previous steps are most relevant for each current step
+    _STEP_RELEVANCE = {
+        "circles_identify_the_customer": ("circles_comprehend_the_situation",),
+        "circles_report_the_customers_needs": ("circles_comprehend_the_situation", "circles_identify_the_customer"),
+        "circles_cut_through_prioritization": ("circles_report_the_customers_needs",),
+        "circles_list_solutions": ("circles_report_the_customers_needs", "circles_cut_through_prioritization"),
+        "circles_evaluate_trade_offs": ("circles_cut_through_prioritization", "circles_list_solutions"),
+        "circles_summarize_recommendations": ("circles_cut_through_prioritization", "circles_list_solutions", "circles_evaluate_trade_offs")
+    }
+    
+    # CIRCLES coverage analysis: (step id, name, keywords) for each step, then the phrases
+    # that show the framework was executed and that the PRD has a comprehensive structure
+    _COVERAGE_STEPS = (
+        ('C1_Comprehend', 'Comprehend the Situation',
+         ('problem', 'context', 'background', 'situation', 'challenge', 'current state', 'market')),
+        ('I_Identify', 'Identify the Customer',
+         ('user', 'customer', 'persona', 'stakeholder', 'target', 'demographics', 'segment')),
+        ('R_Report', 'Report Customer Needs',
+         ('requirement', 'need', 'feature', 'functionality', 'specification', 'acceptance criteria', 'user story')),
+        ('C2_Cut', 'Cut Through Prioritization',
+         ('priority', 'must have', 'should have', 'could have', 'prioritization', 'mvp', 'essential')),
+        ('L_List', 'List Solutions',
+         ('solution', 'approach', 'option', 'alternative', 'implementation', 'design', 'architecture')),
+        ('E_Evaluate', 'Evaluate Trade-offs',
+         ('trade-off', 'pros', 'cons', 'comparison', 'evaluation', 'risk', 'benefit', 'cost')),
+        ('S_Summarize', 'Summarize Recommendations',
+         ('recommendation', 'conclusion', 'next steps', 'summary', 'decision', 'action plan', 'timeline'))
+    )
+    _CIRCLES_EXECUTION_INDICATORS = (
+        'circles framework', 'circles analysis', 'comprehend the situation',
+        'identify the customer', 'report customer needs', 'cut through prioritization',
+        'list solutions', 'evaluate trade-offs', 'summarize recommendations'
+    )
+    _COMPREHENSIVE_INDICATORS = (
+        'requirements table', 'personas table', 'stakeholder matrix',
+        'success metrics', 'implementation plan', 'acceptance criteria',
+        'user stories', 'functional requirements', 'non-functional requirements'
+    )
+    _COVERAGE_CACHE_SIZE = 128  # Recent PRDs whose coverage analysis is kept
+    _MIN_COVERAGE_CHARS = 500  # Shorter output is an error or fallback message, not a document
+    _CONTEXT_TOKEN_LIMIT = 6000  # Prompt plus response tokens a single Groq call is sized within
+    _PRD_RESPONSE_RESERVE_TOKENS = 2500  # Response window a single-call PRD needs for all its tables
+    _MIN_PRODUCT_IDEA_TOKENS = 150  # The product idea is never trimmed below this
+    _COVERAGE_TERMS = tuple(
+        [keyword for _, _, keywords in _COVERAGE_STEPS for keyword in keywords]
+        + list(_CIRCLES_EXECUTION_INDICATORS) + list(_COMPREHENSIVE_INDICATORS)
+    )
+    
+    def __init__(self, groq_api_key: str = None, session_store: SessionStore = None):
         """Initialize the Groq PRD Agent"""
         self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
         if not self.groq_api_key:
             raise ValueError("GROQ_API_KEY environment variable must be set")
         
-        self.client = Groq(api_key=self.groq_api_key)
+        # Single async client shared by every session; HTTP/2 lets concurrent
+        # CIRCLES calls multiplex over one connection
+        self.client = self._create_client()
+        self._client_loop = None
+        
+        # Concurrency limit and quota-aware pacing shared by every Groq request
+        self._rate_limiter = None
+        self._rate_limiter_loop = None
+        self._rate_limit_resume_at = 0.0
         self.model = config.GROQ_MODEL
         self.temperature = config.GROQ_TEMPERATURE
         self.max_tokens = config.GROQ_MAX_TOKENS
         
-        # Load system prompt
-        self.system_prompt = self._load_system_prompt()
+        # Prompts are read and parsed once per process and shared by every agent instance
+        self._prompt_cache = _load_prompt_cache()
+        self._compiled_prd_template = _compile_prd_template_cached()
+        if self._compiled_prd_template is None:
+            raise FileNotFoundError(f"PRD template {config.PRD_TEMPLATE_FILE} could not be loaded")
+        self.system_prompt = _load_system_prompt_cached()
         
         # Initialize template manager (simplified for hackathon)
         self.template_manager = get_template_manager()
         
-        # Session storage (in-memory for hackathon)
-        self.sessions: Dict[str, PRDSession] = {}
+        # Persistent cache of completed Groq responses
+        self.response_cache = None
+        if config.ENABLE_LLM_CACHE:
+            try:
+                self.response_cache = ResponseCache(
+                    os.path.join(os.path.dirname(__file__), config.LLM_CACHE_DIR),
+                    max_entries=config.LLM_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                logging.warning(f"Response cache unavailable, continuing without it: {e}")
+        
+        # Session storage; defaults to the configured backend
+        self.session_store = session_store or self._create_session_store()
+        self._eviction_task = None
+        
+        # Coverage analyses of recent PRDs, keyed by a digest of the PRD text, oldest first
+        self._coverage_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
         
         logging.info("GroqPRDAgent initialized successfully")
 
-    def _load_system_prompt(self) -> str:
-        """Load the system prompt for PRD generation"""
-        try:
-            system_prompt_path = os.path.join(os.path.dirname(__file__), "prompts", "prd_system_prompt.prompt")
-            with open(system_prompt_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            logging.warning(f"Could not load system prompt: {e}")
-            return """You are an expert Product Requirements Document (PRD) generator agent.
-            
-Your primary responsibility is to help product managers and stakeholders create comprehensive, 
-well-structured Product Requirements Documents using the CIRCLES framework.
+    def _create_client(self) -> AsyncGroq:
+        """Create the async Groq client backed by a pooled HTTP/2 connection"""
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=config.GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=config.GROQ_MAX_CONNECTIONS
+            ),
+            timeout=config.DEFAULT_TIMEOUT_SECONDS
+        )
+        return AsyncGroq(api_key=self.groq_api_key, http_client=http_client)
+
+    def _get_client(self) -> AsyncGroq:
+        """Return the shared client, opening a new one if it was closed or the event loop has changed
+        
+        Pooled connections are tied to the loop that opened them, and callers such as
+        the Streamlit app start a fresh loop per generation with asyncio.run.
+        """
+        loop = asyncio.get_running_loop()
+        if self.client is None or (self._client_loop is not None and self._client_loop is not loop):
+            self.client = self._create_client()
+        self._client_loop = loop
+        return self.client
 
-**CIRCLES Framework:**
-- **Comprehend** the situation: Understand the context, background, and problem space
-- **Identify** the customer: Define target users, segments, and stakeholders  
-- **Report** the customer's needs: Document functional, non-functional, and business requirements
-- **Cut** through prioritization: Determine what's essential vs. nice-to-have
-- **List** solutions: Brainstorm and document potential approaches
-- **Evaluate** trade-offs: Analyze pros/cons of different solutions
-- **Summarize** recommendations: Provide clear, actionable recommendations
+    async def aclose(self) -> None:
+        """Close the pooled Groq client and the session store's connections; the next request reopens them
+        
+        Await this before the event loop that made the requests ends, otherwise its
+        keep-alive connections are left open once the loop is gone.
+        """
+        if self.client is not None:
+            await self.client.close()
+        self.client = None
+        self._client_loop = None
+        await self.session_store.aclose()
+
+    def _create_session_store(self) -> SessionStore:
+        """Create the session store selected in config, falling back to process memory"""
+        if config.SESSION_STORE_BACKEND == "redis":
+            try:
+                return RedisSessionStore(config.REDIS_URL, PRDSession, config.SESSION_EXPIRY_DAYS * 24 * 3600)
+            except Exception as e:
+                logging.warning(f"Redis session store unavailable, keeping sessions in memory: {e}")
+        return InMemorySessionStore(max_sessions=config.MAX_STORED_SESSIONS)
 
-Create comprehensive, professional PRD documents with proper formatting and tables."""
+    def _ensure_session_eviction(self) -> None:
+        """Start the background eviction of expired sessions on the running event loop"""
+        if self._eviction_task is None or self._eviction_task.done():
+            self._eviction_task = asyncio.get_running_loop().create_task(self._evict_expired_sessions())
+
+    async def _evict_expired_sessions(self) -> None:
+        """Periodically drop sessions that have not been updated within SESSION_EXPIRY_DAYS"""
+        while True:
+            try:
+                evicted = await self.session_store.evict_older_than(time.time() - config.SESSION_EXPIRY_DAYS * 24 * 3600)
+                if evicted:
+                    logging.info(f"Evicted {evicted} expired sessions")
+            except Exception as e:
+                logging.warning(f"Session eviction failed: {e}")
+            await asyncio.sleep(config.SESSION_EVICTION_INTERVAL_SECONDS)
+
+    def _get_rate_limiter(self) -> asyncio.Semaphore:
+        """Return the request semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._rate_limiter is None or self._rate_limiter_loop is not loop:
+            self._rate_limiter = asyncio.Semaphore(config.GROQ_MAX_CONCURRENT)
+            self._rate_limiter_loop = loop
+        return self._rate_limiter
+
+    @asynccontextmanager
+    async def _create_completion(self, **request: Any) -> AsyncIterator[Any]:
+        """Send a chat completion request, throttled to the Groq rate limits
+        
+        Used as an async context manager around reading the response. At most
+        GROQ_MAX_CONCURRENT requests are in flight: the permit is held until the block
+        exits, so a streamed response counts until its body has been read. New requests
+        pause when the response headers show the request quota is nearly used up, and
+        HTTP 429 responses are retried with exponential backoff and jitter.
+        """
+        for attempt in range(config.GROQ_RATE_LIMIT_RETRIES + 1):
+            async with self._get_rate_limiter():
+                delay = self._rate_limit_resume_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                try:
+                    raw_response = await self._get_client().chat.completions.with_raw_response.create(**request)
+                except RateLimitError as e:
+                    if attempt == config.GROQ_RATE_LIMIT_RETRIES:
+                        raise e
+                    wait_time = self._rate_limit_backoff(attempt, e.response.headers.get("retry-after"))
+                else:
+                    self._track_rate_limit_headers(raw_response.headers)
+                    response = await raw_response.parse()
+                    try:
+                        yield response
+                    finally:
+                        # Release the connection even if the caller stopped reading partway
+                        if isinstance(response, AsyncStream):
+                            await response.close()
+                    return
+            
+            # Back off outside the semaphore so other requests are not held up by this one
+            logging.warning(f"Rate limit hit, retrying in {wait_time:.1f} seconds...")
+            await asyncio.sleep(wait_time)
+
+    def _rate_limit_backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before retrying a rate limited request"""
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), config.GROQ_RATE_LIMIT_MAX_WAIT)
+        except ValueError:
+            pass
+        return min(2 ** attempt, config.GROQ_RATE_LIMIT_MAX_WAIT) + random.uniform(0, 1)
+
+    def _track_rate_limit_headers(self, headers: Any) -> None:
+        """Pause new requests until the quota resets when few requests remain"""
+        try:
+            remaining = int(headers.get("x-ratelimit-remaining-requests", ""))
+        except ValueError:
+            return
+        if remaining > config.GROQ_RATE_LIMIT_MIN_REMAINING:
+            return
+        
+        reset_after = sum(
+            float(value) * _DURATION_UNITS[unit]
+            for value, unit in _DURATION_RE.findall(headers.get("x-ratelimit-reset-requests", ""))
+        )
+        wait_time = min(reset_after or 1.0, config.GROQ_RATE_LIMIT_MAX_WAIT)
+        logging.info(f"Only {remaining} Groq requests left in the current window, pausing new requests for {wait_time:.1f}s")
+        self._rate_limit_resume_at = max(self._rate_limit_resume_at, time.monotonic() + wait_time)
 
     async def generate_prd(self, 
                           product_idea: str,
@@ -87,33 +690,10 @@ Create comprehensive, professional PRD documents with proper formatting and tabl
                           include_appendix: bool = False) -> PRDResult:
         """Generate a complete PRD using Groq with CIRCLES framework"""
         
-        if session_id is None:
-            session_id = str(uuid.uuid4())
-        
-        # Create or update session
-        if session_id not in self.sessions:
-            self.sessions[session_id] = PRDSession(
-                product_idea=product_idea,
-                started_at=datetime.now(),
-                template_id=template_id,
-                conversation_data=conversation_data or {}
-            )
-        
-        session = self.sessions[session_id]
-        
         try:
-            # Execute CIRCLES framework analysis
-            logging.info(f"Starting CIRCLES framework analysis for session {session_id}")
-            circles_responses = await self._execute_circles_framework(product_idea, conversation_data)
-            
-            # Store CIRCLES responses in session
-            session.responses = circles_responses
-            
-            # Get template information
-            template_info = self.template_manager.get_template(template_id)
-            template_prompt = ""
-            if template_info:
-                template_prompt = template_info.get('description', '')
+            session_id, circles_responses, template_prompt = await self._prepare_prd_generation(
+                product_idea, template_id, conversation_data, session_id
+            )
             
             # Generate final PRD using CIRCLES insights
             prd_content = await self._generate_prd_from_circles(
@@ -124,67 +704,252 @@ Create comprehensive, professional PRD documents with proper formatting and tabl
                 include_appendix
             )
             
-            # Perform CIRCLES analysis on final content
-            circles_analysis = await self._analyze_circles_coverage(prd_content)
-            circles_analysis['circles_responses'] = circles_responses  # Include detailed responses
+            return await self._build_prd_result(session_id, prd_content, circles_responses)
             
-            # Create result
-            result = PRDResult(
-                prd_document=prd_content,
-                circles_analysis=circles_analysis,
-                generation_timestamp=datetime.now().isoformat(),
-                session_id=session_id
+        except Exception as e:
+            logging.error(f"Error generating PRD: {e}")
+            raise e
+
+    async def generate_prd_stream(self, 
+                                  product_idea: str,
+                                  template_id: str = "standard_template",
+                                  conversation_data: Dict[str, Any] = None,
+                                  session_id: str = None,
+                                  include_appendix: bool = False) -> AsyncIterator[Union[str, PRDResult]]:
+        """Generate a PRD like generate_prd, yielding document chunks as they arrive and the PRDResult last
+        
+        Streamed chunks are the raw model output; the final PRDResult carries the post-processed document
+        (metadata placeholders, appendix, or the hybrid fallback if the single-call generation fails).
+        If the stream fails partway, no further chunks follow and the PRDResult's document replaces
+        the partial output.
+        """
+        
+        try:
+            session_id, circles_responses, template_prompt = await self._prepare_prd_generation(
+                product_idea, template_id, conversation_data, session_id
             )
             
-            # Update session
-            session.circles_analysis = circles_analysis
+            prd_content = None
+            comprehensive_prompt = self._build_comprehensive_prd_prompt(product_idea, circles_responses)
+            chunks = []
+            if comprehensive_prompt is None:
+                logging.info("Using hybrid approach due to token constraints")
+            else:
+                try:
+                    async for chunk in self._call_groq_api_stream(comprehensive_prompt):
+                        chunks.append(chunk)
+                        yield chunk
+                    prd_content = self._finalize_comprehensive_prd("".join(chunks).strip(), circles_responses, include_appendix)
+                except Exception as e:
+                    logging.error(f"Error generating comprehensive PRD: {e}")
+            
+            if prd_content is None:
+                # The hybrid fallback is not streamed. Deliver it as a single chunk only when nothing has
+                # been sent yet, so joined chunks never hold partial output followed by a second document
+                prd_content = await self._generate_prd_hybrid_approach(product_idea, circles_responses, template_prompt, conversation_data, include_appendix)
+                if not chunks:
+                    yield prd_content
             
-            return result
+            yield await self._build_prd_result(session_id, prd_content, circles_responses)
             
         except Exception as e:
             logging.error(f"Error generating PRD: {e}")
             raise e
 
+    async def _prepare_prd_generation(self,
+                                      product_idea: str,
+                                      template_id: str,
+                                      conversation_data: Dict[str, Any],
+                                      session_id: Optional[str]) -> Tuple[str, Dict[str, str], str]:
+        """Set up the session and run the CIRCLES analysis shared by both generation entry points"""
+        
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+        
+        self._ensure_session_eviction()
+        
+        # Create or update session
+        session = await self.session_store.get(session_id)
+        if session is None:
+            session = PRDSession(
+                product_idea=product_idea,
+                started_at=datetime.now(),
+                template_id=template_id,
+                conversation_data=conversation_data or {}
+            )
+            await self.session_store.set(session_id, session)
+        
+        # Execute CIRCLES framework analysis
+        logging.info(f"Starting CIRCLES framework analysis for session {session_id}")
+        if config.CIRCLES_BATCHED_EXECUTION:
+            circles_responses = await self._execute_circles_framework_batched(product_idea, conversation_data)
+        else:
+            circles_responses = await self._execute_circles_framework(product_idea, conversation_data)
+        
+        # Store CIRCLES responses in session
+        session.responses = circles_responses
+        await self.session_store.set(session_id, session)
+        
+        # Get template information
+        template_info = self.template_manager.get_template(template_id)
+        template_prompt = ""
+        if template_info:
+            template_prompt = template_info.get('description', '')
+        
+        return session_id, circles_responses, template_prompt
+
+    async def _build_prd_result(self, session_id: str, prd_content: str, circles_responses: Dict[str, str]) -> PRDResult:
+        """Run the coverage analysis on the final document and record it on the session"""
+        
+        # Perform CIRCLES analysis on final content
+        circles_analysis = await self._analyze_circles_coverage(prd_content)
+        circles_analysis['circles_responses'] = circles_responses  # Include detailed responses
+        
+        # Create result
+        result = PRDResult(
+            prd_document=prd_content,
+            circles_analysis=circles_analysis,
+            generation_timestamp=datetime.now().isoformat(),
+            session_id=session_id
+        )
+        
+        # Update session
+        session = await self.session_store.get(session_id)
+        if session is not None:
+            session.circles_analysis = circles_analysis
+            await self.session_store.set(session_id, session)
+        
+        return result
+
     async def _execute_circles_framework(self, product_idea: str, conversation_data: Dict[str, Any] = None) -> Dict[str, str]:
         """Execute the complete CIRCLES framework analysis with intelligent context management"""
         
-        circles_steps = [
-            "circles_comprehend_the_situation",
-            "circles_identify_the_customer", 
-            "circles_report_the_customers_needs",
-            "circles_cut_through_prioritization",
-            "circles_list_solutions",
-            "circles_evaluate_trade_offs",
-            "circles_summarize_recommendations"
-        ]
+        circles_steps = self._CIRCLES_STEPS
         
         responses = {}
-        base_context = f"Product Idea: {product_idea}\n\n"
+        base_context = self._build_base_context(product_idea, conversation_data)
+        
+        logging.info("Starting CIRCLES framework execution with context management")
+        
+        # Wave A steps only need the base context; wave B steps build on wave A insights
+        wave_a = [step for step in circles_steps if step not in self._CIRCLES_WAVE_B]
+        wave_b = [step for step in circles_steps if step in self._CIRCLES_WAVE_B]
+        step_tasks = {}
+        
+        async def run_step(step: str, dependencies: List[str]) -> None:
+            # Start as soon as the steps this one builds on are done, while the rest are still in flight
+            if dependencies:
+                await asyncio.wait([step_tasks[dependency] for dependency in dependencies])
+            try:
+                context = {dependency: responses[dependency] for dependency in dependencies}
+                responses[step] = await self._run_circles_step(step, base_context, context)
+            except Exception as e:
+                logging.error(f"Error in CIRCLES step {step}: {e}")
+                # Continue with other steps even if one fails
+                responses[step] = f"Analysis step failed: {str(e)}"
+        
+        for step in wave_a:
+            step_tasks[step] = asyncio.create_task(run_step(step, []))
+        for step in wave_b:
+            dependencies = [dependency for dependency in self._STEP_RELEVANCE.get(step, ()) if dependency in wave_a]
+            step_tasks[step] = asyncio.create_task(run_step(step, dependencies or wave_a))
+        
+        await asyncio.gather(*step_tasks.values())
+        
+        # Preserve the canonical CIRCLES ordering for downstream formatting
+        return {step: responses[step] for step in circles_steps}
+
+    async def _execute_circles_framework_batched(self, product_idea: str, conversation_data: Dict[str, Any] = None) -> Dict[str, str]:
+        """Execute all CIRCLES steps in a single Groq call returning one JSON object
+        
+        Falls back to the per-step execution when the batched response is not valid JSON
+        or does not contain an analysis for every step.
+        """
+        
+        if not all(f"{step}.prompt" in self._prompt_cache for step in self._CIRCLES_STEPS):
+            return await self._execute_circles_framework(product_idea, conversation_data)
+        
+        base_context = self._build_base_context(product_idea, conversation_data)
+        step_blocks = '\n\n'.join(
+            f"=== {step} ===\n{self._prompt_cache[f'{step}.prompt']}" for step in self._CIRCLES_STEPS
+        )
+        
+        batched_prompt = f"""{base_context}Return a JSON object with the keys {', '.join(self._CIRCLES_STEPS)}.
+For each key, produce the analysis described in its prompt block below as a single markdown string. Use clear formatting with:
+- **Bold headers** for main sections
+- Bullet points (-) for lists
+- Numbered lists (1., 2., 3.) for sequential items
+
+Each analysis should be detailed but concise, focusing on actionable insights, and later steps should build on the earlier ones.
+
+{step_blocks}"""
+        
+        logging.info("Starting batched CIRCLES framework execution")
+        
+        try:
+            raw_response = await self._call_groq_api(
+                batched_prompt,
+                response_format={"type": "json_object"},
+                response_budget=self._step_response_budget(base_context) * len(self._CIRCLES_STEPS)
+            )
+            parsed = fast_json.loads(raw_response)
+        except Exception as e:
+            logging.warning(f"Batched CIRCLES execution failed, falling back to per-step calls: {e}")
+            return await self._execute_circles_framework(product_idea, conversation_data)
+        
+        if not isinstance(parsed, dict) or not all(
+            isinstance(parsed.get(step), str) and parsed[step].strip() for step in self._CIRCLES_STEPS
+        ):
+            logging.warning("Batched CIRCLES response missing steps, falling back to per-step calls")
+            return await self._execute_circles_framework(product_idea, conversation_data)
+        
+        return {step: parsed[step].strip() for step in self._CIRCLES_STEPS}
+
+    def _build_base_context(self, product_idea: str, conversation_data: Dict[str, Any] = None) -> str:
+        """Build the product context shared by every CIRCLES step prompt"""
+        
+        context_parts = [f"Product Idea: {product_idea}\n\n"]
         
         # Add any additional context from conversation data (keep concise)
         if conversation_data:
-            base_context += "Additional Context:\n"
+            context_parts.append("Additional Context:\n")
             for key, value in conversation_data.items():
                 if value and len(str(value).strip()) > 0:
                     # Limit context length to prevent token overflow
                     context_value = str(value)[:200] + "..." if len(str(value)) > 200 else str(value)
-                    base_context += f"- {key.replace('_', ' ').title()}: {context_value}\n"
-            base_context += "\n"
+                    context_parts.append(f"- {key.replace('_', ' ').title()}: {context_value}\n")
+            context_parts.append("\n")
         
-        logging.info("Starting CIRCLES framework execution with context management")
+        return "".join(context_parts)
+
+    async def _run_circles_step(self, step: str, base_context: str, responses: Dict[str, str]) -> str:
+        """Build the prompt for a single CIRCLES step and get its analysis from Groq"""
+        full_prompt = self._build_circles_step_prompt(step, base_context, responses)
         
-        for i, step in enumerate(circles_steps):
-            try:
-                # Load the prompt for this CIRCLES step
-                step_prompt = load_prompt(f"{step}.prompt")
-                
-                # Build intelligent context from previous steps (summarized)
-                contextual_insights = ""
-                if i > 0:
-                    contextual_insights = self._build_smart_context(responses, step, max_tokens=1500)
-                
-                # Create the full prompt for this step with token management
-                full_prompt = f"""{base_context}{contextual_insights}
+        # Get response from Groq
+        response = await self._call_groq_api(full_prompt, response_budget=self._step_response_budget(base_context))
+        
+        logging.info(f"Completed CIRCLES step: {step} (context size: {len(full_prompt)} chars)")
+        return response
+
+    def _step_response_budget(self, base_context: str) -> int:
+        """Scale the CIRCLES step response budget with the size of the product context, up to twice the base"""
+        base_budget = config.CIRCLES_STEP_TOKEN_BUDGET
+        return min(base_budget * 2, base_budget + count_tokens(base_context) // 2)
+
+    def _build_circles_step_prompt(self, step: str, base_context: str, responses: Dict[str, str]) -> str:
+        """Build the prompt for a single CIRCLES step from the base context and completed steps"""
+        
+        # Load the prompt for this CIRCLES step
+        step_prompt = self._prompt_cache[f"{step}.prompt"]
+        
+        # Build intelligent context from previous steps (summarized)
+        contextual_insights = ""
+        if responses:
+            contextual_insights = self._build_smart_context(responses, step, max_tokens=1500)
+        
+        # Create the full prompt for this step with token management
+        full_prompt = f"""{base_context}{contextual_insights}
 
 {step_prompt}
 
@@ -195,51 +960,41 @@ Please provide a focused, comprehensive analysis for this step. Use clear format
 - Clear, structured content that can be easily parsed
 
 Your response should be detailed but concise, focusing on actionable insights."""
-                
-                # Estimate token count and truncate if needed
-                estimated_tokens = len(full_prompt.split()) * 1.3  # Rough estimation
-                if estimated_tokens > 4500:  # Leave room for response
-                    logging.warning(f"Context too large for {step}, applying intelligent truncation")
-                    full_prompt = self._truncate_context_intelligently(full_prompt, max_tokens=4000)
-                
-                # Get response from Groq
-                response = await self._call_groq_api(full_prompt)
-                responses[step] = response
-                
-                logging.info(f"Completed CIRCLES step: {step} (context size: ~{len(full_prompt.split())} words)")
-                
-            except Exception as e:
-                logging.error(f"Error in CIRCLES step {step}: {e}")
-                # Continue with other steps even if one fails
-                responses[step] = f"Analysis step failed: {str(e)}"
         
-        return responses
+        # Count tokens and truncate if needed; the shared base context is counted (and cached) on its own
+        estimated_tokens = count_tokens(base_context) + count_tokens(full_prompt[len(base_context):])
+        if estimated_tokens > 4500:  # Leave room for response
+            logging.warning(f"Context too large for {step}, applying intelligent truncation")
+            full_prompt = self._truncate_context_intelligently(full_prompt, max_tokens=4000)
+        
+        return full_prompt
 
     def _build_smart_context(self, responses: Dict[str, str], current_step: str, max_tokens: int = 1500) -> str:
         """Build intelligent context from previous steps with summarization"""
         
-        # Define which previous steps are most relevant for each current step
-        step_relevance = {
-            "circles_identify_the_customer": ["circles_comprehend_the_situation"],
-            "circles_report_the_customers_needs": ["circles_comprehend_the_situation", "circles_identify_the_customer"],
-            "circles_cut_through_prioritization": ["circles_report_the_customers_needs"],
-            "circles_list_solutions": ["circles_report_the_customers_needs", "circles_cut_through_prioritization"],
-            "circles_evaluate_trade_offs": ["circles_cut_through_prioritization", "circles_list_solutions"],
-            "circles_summarize_recommendations": ["circles_cut_through_prioritization", "circles_list_solutions", "circles_evaluate_trade_offs"]
-        }
+        relevant_steps = self._STEP_RELEVANCE.get(current_step)
+        if relevant_steps is None:
+            relevant_steps = tuple(responses)[-2:]  # Last 2 steps as fallback
+        
+        step_insights = {step: responses[step] for step in relevant_steps if step in responses}
         
-        relevant_steps = step_relevance.get(current_step, list(responses.keys())[-2:])  # Last 2 steps as fallback
+        # Full responses are used when they fit (~4 characters per token); otherwise the
+        # largest responses are summarized to key points until the context is within budget
+        char_budget = max_tokens * 4
+        total_length = sum(len(response) for response in step_insights.values())
+        for step in sorted(step_insights, key=lambda s: len(step_insights[s]), reverse=True):
+            if total_length < char_budget:
+                break
+            summary = self._summarize_response(step_insights[step], max_length=300)
+            total_length -= len(step_insights[step]) - len(summary)
+            step_insights[step] = summary
         
         context_parts = []
         context_parts.append("--- Key Insights from Previous Analysis ---")
         
-        for step in relevant_steps:
-            if step in responses:
-                response = responses[step]
-                # Summarize long responses to key points
-                summary = self._summarize_response(response, max_length=300)
-                step_name = step.replace('circles_', '').replace('_', ' ').title()
-                context_parts.append(f"\n{step_name}: {summary}")
+        for step, insight in step_insights.items():
+            step_name = step.replace('circles_', '').replace('_', ' ').title()
+            context_parts.append(f"\n{step_name}: {insight}")
         
         full_context = '\n'.join(context_parts)
         
@@ -259,17 +1014,14 @@ Your response should be detailed but concise, focusing on actionable insights.""
             return response
         
         # Extract key points (look for bullet points, numbered lists, key phrases)
-        lines = response.split('\n')
         key_points = []
+        joined_length = -1  # Length of ' '.join(key_points)
         
-        for line in lines:
-            line = line.strip()
-            if (line.startswith(('- ', '* ', '•')) or 
-                any(line.startswith(f'{i}.') for i in range(1, 20)) or
-                any(keyword in line.lower() for keyword in ['key', 'important', 'primary', 'main', 'critical'])):
-                key_points.append(line[:100])  # Limit each point
-                if len(' '.join(key_points)) > max_length - 50:
-                    break
+        for line in _iter_key_lines(response):
+            key_points.append(line[:100])  # Limit each point
+            joined_length += len(key_points[-1]) + 1
+            if joined_length > max_length - 50:
+                break
         
         if key_points:
             summary = ' '.join(key_points)
@@ -285,8 +1037,7 @@ Your response should be detailed but concise, focusing on actionable insights.""
     def _truncate_context_intelligently(self, prompt: str, max_tokens: int = 4000) -> str:
         """Intelligently truncate context while preserving key information"""
         
-        words = prompt.split()
-        if len(words) <= max_tokens:
+        if count_tokens(prompt) <= max_tokens:
             return prompt
         
         # Split prompt into sections
@@ -312,18 +1063,18 @@ Your response should be detailed but concise, focusing on actionable insights.""
         result_parts = essential_sections[:]
         
         # Add optional sections until we hit token limit
-        remaining_tokens = max_tokens - sum(len(s.split()) for s in essential_sections)
+        remaining_tokens = max_tokens - sum(count_tokens(s) for s in essential_sections)
         
         for section in optional_sections:
-            section_length = len(section.split())
+            section_length = count_tokens(section)
             if section_length < remaining_tokens:
                 result_parts.append(section)
                 remaining_tokens -= section_length
             else:
                 # Add truncated version of this section
-                truncated_words = section.split()[:remaining_tokens-10]
-                if truncated_words:
-                    result_parts.append(' '.join(truncated_words) + "... [truncated]")
+                truncated_section = truncate_to_tokens(section, remaining_tokens - 10)
+                if truncated_section.strip():
+                    result_parts.append(truncated_section + "... [truncated]")
                 break
         
         return '\n\n'.join(result_parts)
@@ -336,19 +1087,68 @@ Your response should be detailed but concise, focusing on actionable insights.""
                                        include_appendix: bool = False) -> str:
         """Generate comprehensive PRD by combining CIRCLES analysis with the full PRD template"""
         
-        # Load the comprehensive PRD template
+        comprehensive_prompt = self._build_comprehensive_prd_prompt(product_idea, circles_responses)
+        if comprehensive_prompt is None:
+            logging.info("Using hybrid approach due to token constraints")
+            return await self._generate_prd_hybrid_approach(product_idea, circles_responses, template_prompt, conversation_data, include_appendix)
+        
+        # Get the comprehensive PRD from Groq using the full template + CIRCLES analysis
         try:
-            prd_template = load_prompt("prd_template.prompt")
+            final_prd = await self._call_groq_api(comprehensive_prompt)
+            return self._finalize_comprehensive_prd(final_prd, circles_responses, include_appendix)
+            
         except Exception as e:
-            logging.error(f"Error loading PRD template: {e}")
-            return await self._create_simple_prd_from_circles(product_idea, circles_responses)
+            logging.error(f"Error generating comprehensive PRD: {e}")
+            # Fallback to hybrid method
+            return await self._generate_prd_hybrid_approach(product_idea, circles_responses, template_prompt, conversation_data, include_appendix)
+
+    def _build_comprehensive_prd_prompt(self, product_idea: str, circles_responses: Dict[str, str]) -> Optional[str]:
+        """Build the single-call PRD prompt, trimming its inputs as needed to fit the token budget
+        
+        Returns None when the prompt cannot fit without cutting the product idea below
+        _MIN_PRODUCT_IDEA_TOKENS; the hybrid approach should be used instead.
+        """
+        
+        # Leaves a response window large enough for the complete document and its tables
+        token_budget = self._CONTEXT_TOKEN_LIMIT - self._PRD_RESPONSE_RESERVE_TOKENS
+        circles_analysis = self._format_circles_analysis_for_prd(circles_responses)
+        comprehensive_prompt = self._render_comprehensive_prd_prompt(product_idea, circles_analysis)
+        
+        # Shorten the per-step CIRCLES excerpts first, then the product idea, instead of
+        # giving up on the single-call generation
+        overflow = count_tokens(comprehensive_prompt) - token_budget
+        if overflow > 0:
+            logging.info(f"PRD prompt ~{overflow} tokens over budget, trimming CIRCLES analysis")
+            analysis_tokens = count_tokens(circles_analysis)
+            step_chars = max(100, int(800 * max(0, analysis_tokens - overflow) / max(analysis_tokens, 1)))
+            circles_analysis = self._format_circles_analysis_for_prd(circles_responses, max_step_chars=step_chars)
+            comprehensive_prompt = self._render_comprehensive_prd_prompt(product_idea, circles_analysis)
+            overflow = count_tokens(comprehensive_prompt) - token_budget
+        
+        if overflow > 0:
+            idea_tokens = count_tokens(product_idea) - overflow
+            if idea_tokens < self._MIN_PRODUCT_IDEA_TOKENS:
+                logging.info(f"PRD prompt ~{overflow} tokens over budget even with a trimmed CIRCLES analysis")
+                return None
+            logging.info(f"PRD prompt still ~{overflow} tokens over budget, trimming product idea")
+            product_idea = truncate_to_tokens(product_idea, idea_tokens)
+            comprehensive_prompt = self._render_comprehensive_prd_prompt(product_idea, circles_analysis)
+            if count_tokens(comprehensive_prompt) > token_budget:
+                return None
+        
+        return comprehensive_prompt
+
+    def _render_comprehensive_prd_prompt(self, product_idea: str, circles_analysis: str) -> str:
+        """Combine the formatted CIRCLES analysis and product idea with the full PRD template"""
+        
+        prd_template = self._prompt_cache[config.PRD_TEMPLATE_FILE]
         
         # Create comprehensive prompt that combines CIRCLES insights with PRD template
-        comprehensive_prompt = f"""
+        return f"""
 Based on the comprehensive CIRCLES framework analysis below, generate a complete, professional Product Requirements Document using the provided template structure.
 
 === CIRCLES FRAMEWORK ANALYSIS ===
-{self._format_circles_analysis_for_prd(circles_responses)}
+{circles_analysis}
 
 === PRODUCT IDEA ===
 {product_idea}
@@ -380,40 +1180,34 @@ Please generate a complete, professional PRD by:
 
 Generate the complete PRD document now:
 """
+
+    def _finalize_comprehensive_prd(self, final_prd: str, circles_responses: Dict[str, str], include_appendix: bool = False) -> str:
+        """Fill in session metadata and attach the CIRCLES appendix to a generated PRD"""
         
-        # Check token count and use hybrid approach if too large
-        estimated_tokens = len(comprehensive_prompt.split()) * 1.3
-        if estimated_tokens > 5500:  # Too large for single call
-            logging.info("Using hybrid approach due to token constraints")
-            return await self._generate_prd_hybrid_approach(product_idea, circles_responses, template_prompt, conversation_data, include_appendix)
+        # Post-process to ensure session metadata is correct
+        now = datetime.now()
+        session_id = now.strftime("%Y%m%d-%H%M%S")
+        generation_date = now.strftime("%Y-%m-%d %H:%M:%S")
         
-        # Get the comprehensive PRD from Groq using the full template + CIRCLES analysis
-        try:
-            final_prd = await self._call_groq_api(comprehensive_prompt)
-            
-            # Post-process to ensure session metadata is correct
-            session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
-            generation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Replace any remaining placeholders with session data
-            final_prd = final_prd.replace("{generation_date}", generation_date)
-            final_prd = final_prd.replace("{session_id}", session_id)
-            final_prd = final_prd.replace("{document_version}", "1.0")
-            
-            # Add CIRCLES appendix if requested
-            if include_appendix:
-                appendix = self._generate_circles_appendix(circles_responses)
-                if "## 📎 Attachments" in final_prd:
-                    final_prd = final_prd.replace("## 📎 Attachments", f"## 📎 Attachments\n\n{appendix}")
-                else:
-                    final_prd += f"\n\n---\n\n## 📚 CIRCLES Framework Analysis\n\n{appendix}"
-            
-            return final_prd
-            
-        except Exception as e:
-            logging.error(f"Error generating comprehensive PRD: {e}")
-            # Fallback to hybrid method
-            return await self._generate_prd_hybrid_approach(product_idea, circles_responses, template_prompt, conversation_data, include_appendix)
+        # Replace any remaining placeholders with session data in a single pass
+        substitutions = {
+            "generation_date": generation_date,
+            "session_id": session_id,
+            "document_version": "1.0"
+        }
+        final_prd = _METADATA_PLACEHOLDER_RE.sub(lambda match: substitutions[match.group(1)], final_prd)
+        
+        # Add CIRCLES appendix if requested, directly under the Attachments heading when present
+        if include_appendix:
+            appendix = self._generate_circles_appendix(circles_responses)
+            attachments_end = final_prd.find(_ATTACHMENTS_HEADING)
+            if attachments_end >= 0:
+                attachments_end += len(_ATTACHMENTS_HEADING)
+                final_prd = f"{final_prd[:attachments_end]}\n\n{appendix}{final_prd[attachments_end:]}"
+            else:
+                final_prd += f"\n\n---\n\n## 📚 CIRCLES Framework Analysis\n\n{appendix}"
+        
+        return final_prd
 
     async def _generate_prd_hybrid_approach(self, 
                                           product_idea: str,
@@ -423,17 +1217,14 @@ Generate the complete PRD document now:
                                           include_appendix: bool = False) -> str:
         """Hybrid approach: Extract insights + use template (fallback method)"""
         
-        # Load the PRD template
-        try:
-            template_content = load_prompt("prd_template.prompt")
-        except Exception as e:
-            logging.warning(f"Could not load PRD template: {e}")
-            return await self._create_simple_prd_from_circles(product_idea, circles_responses)
+        # Use the PRD template compiled at startup
+        compiled_template = self._compiled_prd_template
         
         # Extract key insights from CIRCLES responses
         circles_insights = self._extract_circles_insights(circles_responses)
         
-        # Prepare enhanced template variables using CIRCLES insights
+        # Prepare enhanced template variables using CIRCLES insights, with one timestamp for every date field
+        now = datetime.now()
         template_variables = {
             "product_name": product_idea,
             "product_idea": product_idea,
@@ -449,10 +1240,6 @@ Generate the complete PRD document now:
             "business_goals": circles_insights.get('business_goals', 'Key business objectives and success metrics'),
             "success_vision": circles_insights.get('recommendations_summary', 'Long-term vision and outcomes'),
             "functional_requirements": circles_insights.get('functional_needs', 'Core product functionality'),
-            "requirements_table_rows": self._generate_requirements_table(circles_insights),
-            "customer_personas_table": self._generate_personas_table(circles_insights),
-            "stakeholder_matrix_table": self._generate_stakeholder_table(circles_insights),
-            "feature_prioritization_table": self._generate_prioritization_table(circles_insights),
             "non_functional_requirements": circles_insights.get('non_functional_needs', 'Performance, security, and scalability needs'),
             "performance_requirements": circles_insights.get('performance_needs', 'Speed, reliability, and capacity requirements'),
             "security_requirements": circles_insights.get('security_needs', 'Data protection and access control'),
@@ -472,15 +1259,26 @@ Generate the complete PRD document now:
             "future_enhancements": circles_insights.get('future_enhancements', 'Planned future improvements and features'),
             "success_review": circles_insights.get('success_review', 'Success criteria evaluation process'),
             "attachments": circles_insights.get('attachments', 'Supporting documents and references'),
-            "generation_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "session_id": str(uuid.uuid4())[:8],
+            "generation_date": now.strftime('%Y-%m-%d %H:%M:%S'),
+            "session_id": uuid.uuid4().hex[:8],
             "document_status": "Draft - In Review",
             "document_version": "1.0",
-            "edit_history_rows": "| 1.0 | " + datetime.now().strftime('%Y-%m-%d') + " | Initial Draft | PRD Agent - CIRCLES Framework |",
+            "edit_history_rows": "| 1.0 | " + now.strftime('%Y-%m-%d') + " | Initial Draft | PRD Agent - CIRCLES Framework |",
             "reference_documents_rows": "| 1.0 | Product Specification | TBD | Generated from CIRCLES analysis |",
             "template_id": template_prompt if template_prompt else "standard"
         }
         
+        # Generate tables only for the fields the template actually references
+        table_generators = {
+            "requirements_table_rows": self._generate_requirements_table,
+            "customer_personas_table": self._generate_personas_table,
+            "stakeholder_matrix_table": self._generate_stakeholder_table,
+            "feature_prioritization_table": self._generate_prioritization_table
+        }
+        for field_name, generate_table in table_generators.items():
+            if field_name in compiled_template.fields:
+                template_variables[field_name] = generate_table(circles_insights)
+        
         # Conditionally add appendix section with CIRCLES details
         if include_appendix:
             appendix_content = self._generate_circles_appendix(circles_responses, template_variables)
@@ -488,38 +1286,26 @@ Generate the complete PRD document now:
         else:
             template_variables["appendix_section"] = ""
         
-        # Apply template variables to content
-        try:
-            prd_content = template_content.format(**template_variables)
-        except KeyError as e:
-            logging.warning(f"Template variable missing: {e}")
-            # Use simplified generation as fallback
-            return await self._create_simple_prd_from_circles(product_idea, circles_responses)
+        # Template fields with no generated content get a placeholder instead of failing the render
+        for field_name in compiled_template.fields - template_variables.keys():
+            template_variables[field_name] = "| To be defined |" if field_name.endswith(("_table", "_rows")) else "To be defined"
         
-        return prd_content
+        # Apply template variables to content; every referenced field now has a value
+        return compiled_template.render(template_variables)
 
-    def _format_circles_analysis_for_prd(self, circles_responses: Dict[str, str]) -> str:
+    def _format_circles_analysis_for_prd(self, circles_responses: Dict[str, str], max_step_chars: int = 800) -> str:
         """Format CIRCLES analysis in a clear, structured way for PRD generation"""
         
-        formatted_analysis = ""
-        
-        step_names = {
-            "circles_comprehend_the_situation": "🔍 1. Comprehend the Situation",
-            "circles_identify_the_customer": "👥 2. Identify the Customer", 
-            "circles_report_the_customers_needs": "📋 3. Report Customer Needs",
-            "circles_cut_through_prioritization": "🎯 4. Cut Through Prioritization",
-            "circles_list_solutions": "💡 5. List Solutions",
-            "circles_evaluate_trade_offs": "⚖️ 6. Evaluate Trade-offs",
-            "circles_summarize_recommendations": "🏆 7. Summarize Recommendations"
-        }
+        analysis_parts = []
+        step_names = self._STEP_NAMES
         
         for step_key, response in circles_responses.items():
             step_name = step_names.get(step_key, step_key.replace('_', ' ').title())
             # Limit each step to prevent token overflow while preserving key content
-            limited_response = response[:800] + "..." if len(response) > 800 else response
-            formatted_analysis += f"\n### {step_name}\n{limited_response}\n\n"
+            limited_response = response[:max_step_chars] + "..." if len(response) > max_step_chars else response
+            analysis_parts.append(f"\n### {step_name}\n{limited_response}\n\n")
         
-        return formatted_analysis
+        return "".join(analysis_parts)
 
     def _extract_circles_insights(self, circles_responses: Dict[str, str]) -> Dict[str, str]:
         """Extract key insights from CIRCLES framework responses for PRD generation"""
@@ -574,55 +1360,63 @@ Generate the complete PRD document now:
         if not text:
             return f"Analysis needed for {', '.join(keywords)}"
         
-        text_lower = text.lower()
+        # Find where every keyword occurs in one scan, so absent ones skip the line loops
+        keyword_positions = _find_keyword_positions(text, tuple(keywords))
         
         # Try each keyword to find relevant content
         for keyword in keywords:
             keyword_lower = keyword.lower()
+            if keyword_lower not in keyword_positions:
+                continue
             
             # Look for the keyword in headers or bullet points
-            lines = text.split('\n')
-            section_content = []
-            found_section = False
+            header_re = _compile_header_regex(keyword_lower, _ROBUST_HEADER_MARKERS)
+            header_match = header_re.search(text)
+            if not header_match:
+                continue
             
-            for i, line in enumerate(lines):
-                line_lower = line.lower()
-                
-                # Check if this line contains the keyword and looks like a header
-                if keyword_lower in line_lower and (
-                    line.strip().startswith(('**', '#', '-', '*', '•')) or 
-                    line.strip().endswith(':') or
-                    any(marker in line for marker in ['**', '##', '###'])
-                ):
-                    found_section = True
-                    continue
-                
-                # If we found the section, collect content until next section
-                elif found_section:
-                    if line.strip() and (
-                        line.startswith(('**', '#', '##')) or 
-                        (line.strip().endswith(':') and len(line.strip()) < 50)
-                    ):
-                        # New section started
-                        break
-                    elif line.strip():
-                        section_content.append(line.strip())
+            # Jump to the first section break after the header that is not itself a header
+            break_starts = _section_break_offsets(text)
+            section_end = len(text)
+            for break_start in islice(break_starts, bisect_right(break_starts, header_match.end()), None):
+                if not header_re.match(text, break_start):
+                    section_end = break_start
+                    break
+            
+            # Collect the content in between, skipping any other matching headers
+            section_content = []
+            for line in text[header_match.end():section_end].split('\n'):
+                stripped = line.strip()
+                if stripped and not header_re.match(line):
+                    section_content.append(stripped)
             
             if section_content:
                 result = ' '.join(section_content)
                 if len(result) > 20:  # Make sure we have meaningful content
                     return result[:300] + "..." if len(result) > 300 else result
         
-        # Fallback: look for content that contains any of the keywords
+        # Fallback: look for content that contains any of the keywords, reading just the
+        # '.'-delimited sentence around each keyword offset found above
         for keyword in keywords:
             keyword_lower = keyword.lower()
-            sentences = text.split('.')
+            if keyword_lower not in keyword_positions:
+                continue
             relevant_sentences = []
+            joined_length = -1  # Length of ' '.join(relevant_sentences)
+            sentence_end = -1  # Offset of the '.' closing the last sentence read
             
-            for sentence in sentences:
-                if keyword_lower in sentence.lower() and len(sentence.strip()) > 10:
-                    relevant_sentences.append(sentence.strip())
-                    if len(' '.join(relevant_sentences)) > 200:
+            for offset in keyword_positions[keyword_lower]:
+                if offset <= sentence_end:
+                    continue  # Another match in a sentence already read
+                sentence_start = text.rfind('.', 0, offset) + 1
+                sentence_end = text.find('.', offset)
+                if sentence_end == -1:
+                    sentence_end = len(text)
+                sentence = text[sentence_start:sentence_end].strip()
+                if len(sentence) > 10:
+                    relevant_sentences.append(sentence)
+                    joined_length += len(sentence) + 1
+                    if joined_length > 200:
                         break
             
             if relevant_sentences:
@@ -646,22 +1440,29 @@ Generate the complete PRD document now:
         # Try to extract key points first
         lines = text.split('\n')
         key_points = []
+        joined_length = -1  # Length of ' '.join(key_points)
         
         for line in lines:
             line = line.strip()
-            if line.startswith(('-', '*', '•', '1.', '2.', '3.', '4.', '5.')) or 'key' in line.lower() or 'important' in line.lower():
-                key_points.append(line)
-                if len(' '.join(key_points)) > max_length - 50:
-                    break
+            if not line.startswith(('-', '*', '•', '1.', '2.', '3.', '4.', '5.')):
+                line_lower = line.lower()
+                if 'key' not in line_lower and 'important' not in line_lower:
+                    continue
+            key_points.append(line)
+            joined_length += len(line) + 1
+            if joined_length > max_length - 50:
+                break
         
         if key_points:
             return ' '.join(key_points)
         
-        # Fallback to first and last parts
-        words = text.split()
-        if len(words) > max_length // 4:
-            first_part = ' '.join(words[:max_length//3])
-            last_part = ' '.join(words[-max_length//4:])
+        # Fallback to first and last parts, splitting off only the words that are kept
+        first_count = max_length // 3
+        last_start = -max_length // 4
+        first_words = text.split(maxsplit=first_count)
+        if len(first_words) > max_length // 4:
+            first_part = ' '.join(first_words[:first_count])
+            last_part = ' '.join(text.rsplit(maxsplit=-last_start)[last_start:])
             return f"{first_part}... [analysis continues]... {last_part}"
         
         return text[:max_length] + "..." if len(text) > max_length else text
@@ -671,19 +1472,20 @@ Generate the complete PRD document now:
         if not text or not section_keyword:
             return f"To be defined based on {section_keyword.lower()} analysis"
         
-        lines = text.split('\n')
+        header_re = _compile_header_regex(section_keyword.lower(), _SECTION_HEADER_MARKERS)
+        header_match = header_re.search(text)
         section_content = []
-        in_section = False
         
-        for line in lines:
-            if section_keyword.lower() in line.lower() and ('**' in line or '#' in line or line.strip().endswith(':')):
-                in_section = True
-                continue
-            elif in_section and line.strip() and (line.startswith('**') or line.startswith('#') or line.startswith('##')):
-                # New section started
-                break
-            elif in_section and line.strip():
-                section_content.append(line.strip())
+        if header_match:
+            for line in text[header_match.end():].split('\n')[1:]:
+                if header_re.match(line):
+                    continue
+                stripped = line.strip()
+                if stripped and line.startswith(('**', '#')):
+                    # New section started
+                    break
+                elif stripped:
+                    section_content.append(stripped)
         
         result = ' '.join(section_content)
         return result if result else f"Analysis needed for {section_keyword.lower()}"
@@ -698,31 +1500,19 @@ Generate the complete PRD document now:
         # Extract features from multiple sources
         features = []
         
-        # Enhanced feature extraction
-        all_text = f"{functional_needs} {priority_features} {customer_needs}"
+        # Enhanced feature extraction, scanning each source in place rather than a joined copy
+        sources = (functional_needs, priority_features, customer_needs)
         
-        if all_text.strip():
-            # Look for various list patterns
-            lines = all_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Match various list formats
-                if (line.startswith(('-', '*', '•')) or 
-                    any(line.startswith(f'{i}.') for i in range(1, 20)) or
-                    line.startswith(('○', '▪', '▫')) or
-                    ('feature' in line.lower() or 'capability' in line.lower() or 'function' in line.lower())):
-                    
-                    # Clean the feature text
-                    feature = line.lstrip('-*•○▪▫0123456789. ').strip()
-                    if feature and len(feature) > 15 and len(feature) < 100:  # Reasonable length
-                        features.append(feature)
+        # Look for various list patterns, scanning only the candidate lines
+        for line in chain.from_iterable(_iter_feature_lines(source) for source in sources if source):
+            # Clean the feature text
+            feature = line.lstrip(_FEATURE_MARKER_CHARS).strip()
+            if feature and len(feature) > 15 and len(feature) < 100:  # Reasonable length
+                features.append(feature)
         
         # If no structured features found, create intelligent defaults based on available text
         if not features:
-            features = self._generate_default_features(all_text)
+            features = self._generate_default_features(' '.join(sources))
         
         # Generate professional table rows
         table_rows = []
@@ -733,14 +1523,16 @@ Generate the complete PRD document now:
             priority = "Must Have" if i < 3 else "Should Have" if i < 6 else "Could Have"
             mvp = "Yes" if i < 3 else "No"
             
+            feature_lower = feature.lower()
+            
             # Create user story
-            user_story = f"As a user, I want to {feature.lower()}" if not feature.lower().startswith('as a') else feature
+            user_story = f"As a user, I want to {feature_lower}" if not feature_lower.startswith('as a') else feature
             
             # Create acceptance criteria
             acceptance = f"Given the system is operational, when I {feature[:30].lower()}..., then the feature works as expected"
             
             # Assign teams
-            owner = "Product" if "business" in feature.lower() else "Engineering"
+            owner = "Product" if "business" in feature_lower else "Engineering"
             tester = "QA" if priority == "Must Have" else "UAT"
             
             # Effort estimate
@@ -753,25 +1545,22 @@ Generate the complete PRD document now:
         
         # Ensure we have at least one row
         if not table_rows:
-            table_rows.append("| REQ-001 | Core | Yes | Must Have | Core product functionality | As a user, I want essential features | Given core functionality, when I use the system, then it meets my basic needs | Engineering | QA | Medium |")
+            return _DEFAULT_REQUIREMENT_ROW
         
         return '\n'.join(table_rows)
 
     def _generate_default_features(self, text: str) -> List[str]:
         """Generate default features when structured extraction fails"""
         
-        # Look for key action words and concepts
-        action_words = ['create', 'manage', 'view', 'edit', 'delete', 'search', 'filter', 'sort', 'export', 'import', 'configure', 'monitor', 'track', 'analyze', 'report']
-        
         features = []
         
         if text:
-            words = text.lower().split()
+            words = frozenset(text.casefold().split())
             
-            # Look for common feature patterns
-            for action in action_words:
-                if action in words:
-                    features.append(f"{action.title()} functionality")
+            # Look for key action words, keeping their listed order
+            matched_actions = _FEATURE_ACTION_WORD_SET & words
+            if matched_actions:
+                features.extend(f"{action.title()} functionality" for action in _FEATURE_ACTION_WORDS if action in matched_actions)
             
             # Look for domain-specific features
             if 'user' in words:
@@ -806,11 +1595,12 @@ Generate the complete PRD document now:
         customer_segments = insights.get('customer_segments', '')
         customer_context = insights.get('customer_context', '')
         
-        # Enhanced persona extraction
+        # Enhanced persona extraction; with no customer text at all, go straight to the defaults
         personas = []
-        all_customer_text = f"{customer_info} {customer_segments} {customer_context}"
+        all_customer_text = ""
         
-        if all_customer_text.strip():
+        if customer_info.strip() or customer_segments.strip() or customer_context.strip():
+            all_customer_text = f"{customer_info} {customer_segments} {customer_context}"
             personas = self._extract_personas_from_text_enhanced(all_customer_text)
         
         # If no personas extracted, create intelligent defaults
@@ -838,48 +1628,32 @@ Generate the complete PRD document now:
         
         personas = []
         lines = text.split('\n')
-        
-        # Look for persona indicators
-        persona_keywords = ['persona', 'user type', 'customer segment', 'target user', 'primary user', 'secondary user']
-        role_keywords = ['manager', 'administrator', 'analyst', 'developer', 'executive', 'employee', 'customer', 'client']
+        lines_casefolded = text.casefold().split('\n')  # Case-folded once, indexed alongside lines
         
         current_persona = {}
         
-        for line in lines:
+        for line, line_casefolded in zip(lines, lines_casefolded):
             line = line.strip()
             if not line:
                 continue
             
-            line_lower = line.lower()
+            terms = _line_terms(line_casefolded)
             
             # Detect new persona
-            if any(keyword in line_lower for keyword in persona_keywords) or any(keyword in line_lower for keyword in role_keywords):
+            if terms & _PERSONA_START_TERMS:
                 if current_persona:
                     personas.append(current_persona)
                 
                 # Extract persona name
                 persona_name = line[:40] if len(line) < 40 else line.split()[0] + " User"
-                current_persona = {
-                    'name': persona_name.replace(':', '').strip(),
-                    'demographics': 'Professional user',
-                    'goals': 'Achieve efficiency and productivity',
-                    'pain_points': 'Current process limitations',
-                    'use_cases': 'Daily operational workflows',
-                    'metrics': 'Time saved and accuracy improved'
-                }
+                current_persona = {'name': persona_name.replace(':', '').strip(), **_PERSONA_ATTRIBUTE_DEFAULTS}
             
             # Extract specific attributes
             elif current_persona:
-                if any(keyword in line_lower for keyword in ['age', 'demographic', 'background', 'experience']):
-                    current_persona['demographics'] = line[:50]
-                elif any(keyword in line_lower for keyword in ['goal', 'objective', 'want', 'need']):
-                    current_persona['goals'] = line[:60]
-                elif any(keyword in line_lower for keyword in ['pain', 'problem', 'challenge', 'frustration']):
-                    current_persona['pain_points'] = line[:60]
-                elif any(keyword in line_lower for keyword in ['use case', 'scenario', 'workflow', 'task']):
-                    current_persona['use_cases'] = line[:60]
-                elif any(keyword in line_lower for keyword in ['success', 'metric', 'measure', 'kpi']):
-                    current_persona['metrics'] = line[:50]
+                attribute_terms = terms & _PERSONA_ATTRIBUTE_TERMS
+                if attribute_terms:
+                    _, field_name, limit = min(_PERSONA_ATTRIBUTE_BY_TERM[term] for term in attribute_terms)
+                    current_persona[field_name] = line[:limit]
         
         if current_persona:
             personas.append(current_persona)
@@ -895,7 +1669,7 @@ Generate the complete PRD document now:
         personas = []
         
         # Determine business type and create relevant personas
-        if any(word in text_lower for word in ['enterprise', 'business', 'corporate', 'organization']):
+        if any(word in text_lower for word in _BUSINESS_CONTEXT_WORDS):
             personas.extend([
                 {
                     'name': 'Business User',
@@ -915,7 +1689,7 @@ Generate the complete PRD document now:
                 }
             ])
         
-        if any(word in text_lower for word in ['customer', 'client', 'external', 'public']):
+        if any(word in text_lower for word in _CUSTOMER_CONTEXT_WORDS):
             personas.append({
                 'name': 'End Customer',
                 'demographics': 'Varied demographics, digital natives',
@@ -925,7 +1699,7 @@ Generate the complete PRD document now:
                 'metrics': 'Task completion rate and satisfaction'
             })
         
-        if any(word in text_lower for word in ['technical', 'developer', 'IT', 'system']):
+        if any(word in text_lower for word in _TECHNICAL_CONTEXT_WORDS):
             personas.append({
                 'name': 'Technical User',
                 'demographics': 'Technical professional, 25-40 years',
@@ -961,21 +1735,8 @@ Generate the complete PRD document now:
     def _generate_stakeholder_table(self, insights: Dict[str, str]) -> str:
         """Generate stakeholder matrix table from CIRCLES insights"""
         
-        # Default stakeholders for business projects
-        stakeholders = [
-            {'name': 'Product Owner', 'role': 'Business Lead', 'influence': 'High', 'interest': 'High', 'frequency': 'Daily', 'concerns': 'Business outcomes'},
-            {'name': 'End Users', 'role': 'Primary Users', 'influence': 'Medium', 'interest': 'High', 'frequency': 'As needed', 'concerns': 'Usability & value'},
-            {'name': 'Development Team', 'role': 'Implementation', 'influence': 'High', 'interest': 'Medium', 'frequency': 'Daily', 'concerns': 'Technical feasibility'},
-            {'name': 'Executive Sponsor', 'role': 'Decision Maker', 'influence': 'High', 'interest': 'Medium', 'frequency': 'Weekly', 'concerns': 'ROI & timeline'}
-        ]
-        
-        # Generate table rows
-        table_rows = []
-        for stakeholder in stakeholders:
-            row = f"| {stakeholder['name']} | {stakeholder['role']} | {stakeholder['influence']} | {stakeholder['interest']} | {stakeholder['frequency']} | {stakeholder['concerns']} |"
-            table_rows.append(row)
-        
-        return '\n'.join(table_rows)
+        # Default stakeholders for business projects, formatted once at import
+        return _DEFAULT_STAKEHOLDER_TABLE
 
     def _generate_prioritization_table(self, insights: Dict[str, str]) -> str:
         """Generate feature prioritization table from CIRCLES insights"""
@@ -992,32 +1753,24 @@ Generate the complete PRD document now:
                 lines = text.split('\n')
                 for line in lines:
                     line = line.strip()
-                    if line.startswith(('-', '*', '•')) or any(line.startswith(f'{i}.') for i in range(1, 20)):
-                        feature = line.lstrip('-*•0123456789. ').strip()
+                    if line.startswith(_LIST_ITEM_PREFIXES):
+                        feature = line.lstrip(_LIST_MARKER_CHARS).strip()
                         if feature and len(feature) > 10:
                             features.append(feature[:50])  # Limit length
         
         # If no features found, create generic ones
         if not features:
-            features = [
-                'Core functionality implementation',
-                'User authentication and access',
-                'Data management and storage',
-                'User interface and experience',
-                'Integration capabilities'
-            ]
+            features = _DEFAULT_PRIORITIZATION_FEATURES
         
         # Generate prioritization table
         table_rows = []
-        priorities = ['High', 'High', 'Medium', 'Medium', 'Low']
-        phases = ['MVP', 'MVP', 'Phase 1', 'Phase 1', 'Phase 2']
         
         for i, feature in enumerate(features[:5]):
-            business_value = priorities[i] if i < len(priorities) else 'Medium'
+            business_value = _PRIORITIZATION_VALUES[i] if i < len(_PRIORITIZATION_VALUES) else 'Medium'
             effort = 'Medium' if business_value == 'High' else 'Low'
             risk = 'Low' if business_value == 'High' else 'Medium'
             score = '90' if business_value == 'High' else '70' if business_value == 'Medium' else '50'
-            phase = phases[i] if i < len(phases) else 'Future'
+            phase = _PRIORITIZATION_PHASES[i] if i < len(_PRIORITIZATION_PHASES) else 'Future'
             
             row = f"| {feature} | {business_value} | {effort} | {risk} | {score} | {phase} | TBD |"
             table_rows.append(row)
@@ -1031,15 +1784,16 @@ Generate the complete PRD document now:
         
         # Look for common persona indicators
         lines = text.split('\n')
+        lines_casefolded = text.casefold().split('\n')  # Case-folded once, indexed alongside lines
         current_persona = {}
         
-        for line in lines:
+        for line, line_lower in zip(lines, lines_casefolded):
             line = line.strip()
             if not line:
                 continue
                 
             # Look for persona names or segments
-            if any(indicator in line.lower() for indicator in ['persona', 'user type', 'segment', 'customer']):
+            if any(indicator in line_lower for indicator in ['persona', 'user type', 'segment', 'customer']):
                 if current_persona:
                     personas.append(current_persona)
                 current_persona = {
@@ -1053,11 +1807,11 @@ Generate the complete PRD document now:
             
             # Look for specific attributes
             if current_persona:
-                if any(keyword in line.lower() for keyword in ['demographic', 'age', 'role']):
+                if any(keyword in line_lower for keyword in ['demographic', 'age', 'role']):
                     current_persona['demographics'] = line[:50]
-                elif any(keyword in line.lower() for keyword in ['goal', 'objective', 'want']):
+                elif any(keyword in line_lower for keyword in ['goal', 'objective', 'want']):
                     current_persona['goals'] = line[:50]
-                elif any(keyword in line.lower() for keyword in ['pain', 'problem', 'challenge']):
+                elif any(keyword in line_lower for keyword in ['pain', 'problem', 'challenge']):
                     current_persona['pain_points'] = line[:50]
         
         if current_persona:
@@ -1076,94 +1830,19 @@ Generate the complete PRD document now:
         
         return personas
 
-    def _generate_circles_appendix(self, circles_responses: Dict[str, str], template_variables: Dict[str, str]) -> str:
+    def _generate_circles_appendix(self, circles_responses: Dict[str, str], template_variables: Dict[str, str] = None) -> str:
         """Generate detailed CIRCLES appendix with full analysis"""
         
-        appendix_content = f"""
----
-
-## 📋 Appendix
-
-### A. Complete CIRCLES Framework Analysis
-
-This document was generated using a comprehensive CIRCLES framework methodology with detailed analysis at each step:
-
-**C - Comprehend the Situation:**
-{circles_responses.get('circles_comprehend_the_situation', 'Analysis not available')[:800]}...
-
-**I - Identify the Customer:**
-{circles_responses.get('circles_identify_the_customer', 'Analysis not available')[:800]}...
-
-**R - Report Customer Needs:**
-{circles_responses.get('circles_report_the_customers_needs', 'Analysis not available')[:800]}...
-
-**C - Cut Through Prioritization:**
-{circles_responses.get('circles_cut_through_prioritization', 'Analysis not available')[:800]}...
-
-**L - List Solutions:**
-{circles_responses.get('circles_list_solutions', 'Analysis not available')[:800]}...
-
-**E - Evaluate Trade-offs:**
-{circles_responses.get('circles_evaluate_trade_offs', 'Analysis not available')[:800]}...
-
-**S - Summarize Recommendations:**
-{circles_responses.get('circles_summarize_recommendations', 'Analysis not available')[:800]}...
-
-### B. Generation Methodology
-- **Framework Used:** CIRCLES (7-step structured analysis)
-- **AI Model:** Groq llama-3.1-8b-instant 
-- **Template:** {template_variables.get('template_id', 'Standard')}
-- **Generation Method:** Multi-step analysis with context building
-- **Quality Assurance:** Automated CIRCLES coverage analysis
-
-### C. Definitions and Acronyms
-| Term | Definition |
-|------|------------|
-| PRD | Product Requirements Document |
-| CIRCLES | Comprehensive framework: Comprehend, Identify, Report, Cut, List, Evaluate, Summarize |
-| MVP | Minimum Viable Product |
-| UAT | User Acceptance Testing |
-| BRD | Business Requirements Document |
-
-### D. Analysis Quality Metrics
-- **Framework Completeness:** All 7 CIRCLES steps executed
-- **Context Integration:** Previous step insights inform subsequent analysis
-- **Insight Extraction:** Key findings mapped to PRD sections
-- **Template Alignment:** Structured output following business standards
-
-### E. Additional Resources
-- CIRCLES Methodology: Product School Framework
-- Template Documentation: See templates/README.md  
-- Quality Evaluation: 6-criteria assessment system
-- Generation Source: Groq Lightning-Fast AI Platform
-"""
-        
-        return appendix_content
-
-    async def _create_simple_prd_from_circles(self, product_idea: str, circles_responses: Dict[str, str]) -> str:
-        """Fallback method to create PRD when template fails"""
-        
-        simple_prompt = f"""
-Based on the product idea: {product_idea}
-
-And the following CIRCLES framework analysis:
-
-{json.dumps(circles_responses, indent=2)}
-
-Generate a comprehensive Product Requirements Document with the following structure:
-
-1. Executive Summary
-2. Problem Statement  
-3. Target Customers
-4. Requirements (Functional & Non-functional)
-5. Success Metrics
-6. Implementation Plan
-7. Risks and Mitigation
-
-Please provide a detailed, professional PRD document.
-"""
+        template_variables = template_variables or {}
         
-        return await self._call_groq_api(simple_prompt)
+        step_analysis = '\n'.join(
+            f"**{label}:**\n{circles_responses.get(step_key, 'Analysis not available')[:800]}...\n"
+            for step_key, label in _CIRCLES_APPENDIX_STEPS
+        )
+        return _CIRCLES_APPENDIX_TEMPLATE.format(
+            step_analysis=step_analysis,
+            template_id=template_variables.get('template_id', 'Standard')
+        )
 
     def _create_generation_prompt(self, 
                                  product_idea: str, 
@@ -1178,127 +1857,45 @@ Please provide a detailed, professional PRD document.
         
         # Load the PRD template
         try:
-            template_content = load_prompt("prd_template.prompt")
+            template_content = self._prompt_cache[config.PRD_TEMPLATE_FILE]
         except Exception as e:
             logging.warning(f"Could not load PRD template: {e}")
             # Fallback to simple generation
             return self._create_simple_generation_prompt(product_idea, template_prompt, conversation_data)
         
-        # Prepare template variables
+        # Prepare template variables, with one timestamp for every date field
+        now = datetime.now()
         template_variables = {
+            **_LEGACY_TEMPLATE_VARIABLES,
             "product_name": product_idea,
             "product_idea": product_idea,
-            "situation_context": "To be analyzed based on product description",
-            "background_analysis": "Market and competitive analysis needed",
-            "market_context": "Target market to be defined",
-            "business_context": "Business objectives and goals",
-            "technical_context": "Technical requirements and constraints",
-            "intent_statement": "Primary business objectives and user needs",
-            "customer_description": "Target customer segments and personas",
-            "customer_segments": "Primary and secondary user groups",
-            "customer_context": "User scenarios and use cases",
-            "business_goals": "Key business objectives and success metrics",
-            "success_vision": "Long-term vision and outcomes",
-            "functional_requirements": "Core product functionality",
-            "requirements_table_rows": "| Core Feature | Yes | Must Have | Essential functionality | As a user, I want core features | Features work as expected | Engineering | QA |",
-            "non_functional_requirements": "Performance, security, and scalability needs",
-            "performance_requirements": "Speed, reliability, and capacity requirements",
-            "security_requirements": "Data protection and access control",
-            "scalability_requirements": "Growth and expansion capabilities",
-            "optional_features": "Future enhancements and nice-to-have features",
-            "out_of_scope": "Features explicitly not included in current version",
-            "success_metrics": "Key performance indicators and measurement criteria",
-            "acceptance_criteria": "Specific testable requirements",
-            "performance_targets": "Quantifiable performance goals",
-            "implementation_phases": "Development timeline and milestones",
-            "mvp_definition": "Minimum viable product scope",
-            "timeline": "Project schedule and key dates",
-            "resource_requirements": "Team and infrastructure needs",
-            "risk_mitigation": "Identified risks and mitigation strategies",
-            "monitoring_strategy": "Success tracking and performance monitoring",
-            "feedback_mechanisms": "User feedback collection and analysis",
-            "future_enhancements": "Planned future improvements and features",
-            "success_review": "Success criteria evaluation process",
-            "attachments": "Supporting documents and references",
-            "generation_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "session_id": str(uuid.uuid4())[:8],
-            "document_status": "Draft - In Review",
-            "document_version": "1.0",
-            "edit_history_rows": "| 1.0 | " + datetime.now().strftime('%Y-%m-%d') + " | Initial Draft | PRD Agent |",
-            "reference_documents_rows": "| 1.0 | Product Specification | TBD | To be defined |",
+            "generation_date": now.strftime('%Y-%m-%d %H:%M:%S'),
+            "session_id": uuid.uuid4().hex[:8],
+            "edit_history_rows": "| 1.0 | " + now.strftime('%Y-%m-%d') + " | Initial Draft | PRD Agent |",
             "template_id": template_prompt if template_prompt else "standard"
         }
         
         # Conditionally add appendix section
         if include_appendix:
-            appendix_content = f"""
----
-
-## 📋 Appendix
-
-### A. CIRCLES Framework Analysis
-This document was generated using the CIRCLES framework methodology:
-
-**Comprehend the Situation:**
-{template_variables['situation_context']}
-
-**Identify the Customer:**
-{template_variables['customer_description']}
-
-**Report Customer Needs:**
-{template_variables['intent_statement']}
-
-**Cut Through Prioritization:**
-{template_variables['business_goals']}
-
-**List Solutions:**
-{template_variables['functional_requirements']}
-
-**Evaluate Trade-offs:**
-{template_variables['non_functional_requirements']}
-
-**Summarize Recommendations:**
-{template_variables['success_vision']}
-
-### B. Template Information
-- **Template Used:** {template_variables['template_id']}
-- **Generation Method:** Groq AI with CIRCLES Framework
-- **Quality Score:** [To be evaluated]
-
-### C. Definitions and Acronyms
-| Term | Definition |
-|------|------------|
-| PRD | Product Requirements Document |
-| CIRCLES | Comprehend, Identify, Report, Cut, List, Evaluate, Summarize |
-| MVP | Minimum Viable Product |
-| UAT | User Acceptance Testing |
-| BRD | Business Requirements Document |
-
-### D. Additional Resources
-- Template Documentation: See templates/README.md
-- CIRCLES Methodology: Product School Framework
-- Quality Evaluation: 6-criteria assessment system
-"""
+            appendix_content = _LEGACY_APPENDIX_TEMPLATE.format_map(template_variables)
             template_variables['appendix_section'] = appendix_content
         else:
             template_variables['appendix_section'] = ""
         
-        # Create the full prompt
-        full_prompt = f"""{self.system_prompt}
+        # Create the full prompt, collecting the parts and joining them once
+        prompt_parts = [f"""{self.system_prompt}
 
 **Template Context:** {template_prompt if template_prompt else 'Standard PRD Template'}
 
 **Product/Project Description:**
 {product_idea}
 
-**Additional Context:**"""
+**Additional Context:**"""]
         
         if conversation_data:
-            for key, value in conversation_data.items():
-                if value:
-                    full_prompt += f"\\n- {key}: {value}"
+            prompt_parts.extend(f"\\n- {key}: {value}" for key, value in conversation_data.items() if value)
         
-        full_prompt += f"""
+        prompt_parts.append(f"""
 
 **Task:**
 Generate a comprehensive Product Requirements Document (PRD) using the following template structure. Fill in all template variables with appropriate content based on the product description and context.
@@ -1316,9 +1913,9 @@ Generate a comprehensive Product Requirements Document (PRD) using the following
 6. Ensure the document is professional and actionable
 
 **Output:**
-Return ONLY the complete PRD document with all template variables filled in. Do not include any explanations outside the document."""
+Return ONLY the complete PRD document with all template variables filled in. Do not include any explanations outside the document.""")
 
-        return full_prompt
+        return "".join(prompt_parts)
     
     def _create_simple_generation_prompt(self, 
                                        product_idea: str, 
@@ -1359,13 +1956,49 @@ Return ONLY the complete PRD document in markdown format. Do not include any exp
         
         return "\\n".join(prompt_parts)
 
-    async def _call_groq_api(self, prompt: str, max_retries: int = 2) -> str:
+    async def _call_groq_api(self, prompt: str, max_retries: int = 2, response_format: Dict[str, str] = None,
+                             response_budget: Optional[int] = None) -> str:
         """Call the Groq API to generate content with token management and error recovery"""
         
         for attempt in range(max_retries + 1):
+            chunks = []
+            try:
+                async for chunk in self._call_groq_api_stream(prompt, max_retries, response_format, response_budget):
+                    chunks.append(chunk)
+            except Exception as e:
+                # Failures before the first chunk were already retried by the stream. A response cut
+                # off partway has not reached the caller, so discard it and ask again
+                if not chunks or attempt == max_retries:
+                    raise e
+                logging.warning(f"Groq response interrupted on attempt {attempt + 1}, retrying: {e}")
+                continue
+            return "".join(chunks).strip()
+
+    async def _call_groq_api_stream(self, prompt: str, max_retries: int = 2, response_format: Dict[str, str] = None,
+                                    response_budget: Optional[int] = None) -> AsyncIterator[str]:
+        """Stream Groq completion chunks as they arrive, with the same token management and error recovery
+        
+        response_budget is the token count hinted to the model; it defaults to the max_tokens left for the response.
+        """
+        
+        # Serve identical requests from the persistent response cache
+        cache_key = None
+        if self.response_cache:
+            # The hint settings change what is sent, so responses generated under other settings are not reused
+            budget_hint = f"{response_budget}/{self.max_tokens}" if config.ENABLE_TOKEN_BUDGET_HINTS else ""
+            cache_key = ResponseCache.make_key(self.model, self.temperature, prompt, response_format, budget_hint)
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                logging.info("Serving Groq response from cache")
+                yield cached_response
+                return
+        
+        for attempt in range(max_retries + 1):
+            # Once output has reached the caller the request can no longer be retried transparently
+            chunks_yielded = False
             try:
-                # Estimate token count (rough approximation)
-                estimated_tokens = len(prompt.split()) * 1.3
+                # Count prompt tokens
+                estimated_tokens = count_tokens(prompt)
                 
                 # Adjust max_tokens based on prompt length to stay within limits
                 response_tokens = min(self.max_tokens, max(500, 6000 - int(estimated_tokens)))
@@ -1373,27 +2006,60 @@ Return ONLY the complete PRD document in markdown format. Do not include any exp
                 if estimated_tokens > 5500:  # Close to limit
                     logging.warning(f"Large prompt detected (~{estimated_tokens:.0f} tokens), truncating...")
                     prompt = self._emergency_truncate_prompt(prompt, max_tokens=4000)
-                    estimated_tokens = len(prompt.split()) * 1.3
+                    estimated_tokens = count_tokens(prompt)
                     response_tokens = min(1500, 6000 - int(estimated_tokens))
                 
-                response = self.client.chat.completions.create(
+                # Asking for a budget up front keeps the model from spending decode time it does not need
+                request_prompt = prompt
+                if config.ENABLE_TOKEN_BUDGET_HINTS:
+                    budget = min(response_budget or response_tokens, response_tokens)
+                    request_prompt += f"\n\n[Token budget: keep the full response under {budget} tokens; be terse where possible.]"
+                
+                # JSON mode responses are only useful once complete, so they are not streamed
+                stream = response_format is None
+                async with self._create_completion(
                     model=self.model,
                     messages=[
                         {
                             "role": "user", 
-                            "content": prompt
+                            "content": request_prompt
                         }
                     ],
                     temperature=self.temperature,
                     max_tokens=response_tokens,
                     top_p=1,
-                    stream=False
-                )
+                    stream=stream,
+                    **({"response_format": response_format} if response_format else {})
+                ) as response:
+                    if stream:
+                        chunks = []
+                        async for chunk in response:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                chunks.append(delta)
+                                chunks_yielded = True
+                                yield delta
+                        content = "".join(chunks).strip()
+                    else:
+                        content = response.choices[0].message.content.strip()
                 
-                content = response.choices[0].message.content
-                return content.strip()
+                if not stream:
+                    yield content
+                
+                if cache_key:
+                    self.response_cache.set(cache_key, content)
+                return
                 
             except Exception as e:
+                if chunks_yielded:
+                    logging.error(f"Groq stream interrupted: {e}")
+                    raise e
+                
+                # _create_completion has already backed off and retried HTTP 429 responses
+                if isinstance(e, RateLimitError):
+                    logging.error(f"Groq rate limit retries exhausted: {e}")
+                    raise e
+                
                 error_str = str(e)
                 
                 # Handle specific token limit errors
@@ -1405,16 +2071,8 @@ Return ONLY the complete PRD document in markdown format. Do not include any exp
                         continue
                     else:
                         logging.error(f"Final attempt failed due to token limits")
-                        return f"Analysis incomplete due to context size limitations. Key points: {prompt[:200]}..."
-                
-                # Handle rate limiting
-                if "rate_limit" in error_str.lower():
-                    if attempt < max_retries:
-                        import asyncio
-                        wait_time = (attempt + 1) * 2  # Exponential backoff
-                        logging.warning(f"Rate limit hit, waiting {wait_time} seconds...")
-                        await asyncio.sleep(wait_time)
-                        continue
+                        yield f"Analysis incomplete due to context size limitations. Key points: {prompt[:200]}..."
+                        return
                 
                 # For other errors, log and raise
                 logging.error(f"Groq API call failed on attempt {attempt + 1}: {e}")
@@ -1424,115 +2082,75 @@ Return ONLY the complete PRD document in markdown format. Do not include any exp
     def _emergency_truncate_prompt(self, prompt: str, max_tokens: int = 2000) -> str:
         """Emergency prompt truncation when token limits are exceeded"""
         
-        words = prompt.split()
-        if len(words) <= max_tokens:
+        if count_tokens(prompt) <= max_tokens:
             return prompt
         
-        # Try to preserve the essential parts
-        lines = prompt.split('\n')
-        
-        # Keep the first few lines (usually product idea) and last few lines (usually the question)
-        essential_lines = []
-        
-        # Add first 5 lines (product context)
-        essential_lines.extend(lines[:5])
-        
-        # Add last 3 lines (usually the instruction/question)
-        essential_lines.extend(lines[-3:])
+        # Keep the first 5 lines (usually product idea) and last 3 lines (usually the question),
+        # located by newline offsets so the prompt is sliced rather than split into a list of lines
+        head_end = -1
+        for _ in range(5):
+            head_end = prompt.find('\n', head_end + 1)
+            if head_end == -1:
+                head_end = len(prompt)
+                break
+        tail_start = len(prompt)
+        for _ in range(3):
+            tail_start = prompt.rfind('\n', 0, tail_start)
+            if tail_start == -1:
+                break
+        tail_start += 1
+        head, tail = prompt[:head_end], prompt[tail_start:]
         
-        essential_text = '\n'.join(essential_lines)
-        essential_words = essential_text.split()
+        essential_text = head + '\n' + tail
+        essential_tokens = count_tokens(essential_text)
         
-        if len(essential_words) > max_tokens:
-            # Final fallback - just take the first max_tokens words
-            return ' '.join(essential_words[:max_tokens]) + "\n\nPlease provide a focused analysis based on the above context."
+        if essential_tokens > max_tokens:
+            # Final fallback - just take the first max_tokens tokens
+            return truncate_to_tokens(essential_text, max_tokens) + "\n\nPlease provide a focused analysis based on the above context."
         
         # Try to add some middle content if we have room
-        remaining_tokens = max_tokens - len(essential_words)
-        if remaining_tokens > 100 and len(lines) > 8:
-            middle_lines = lines[5:-3]
-            middle_text = '\n'.join(middle_lines)
-            middle_words = middle_text.split()
+        remaining_tokens = max_tokens - essential_tokens
+        if remaining_tokens > 100 and head_end < tail_start - 1:  # More than 8 lines
+            middle_text = prompt[head_end + 1:tail_start - 1]
             
-            if len(middle_words) > remaining_tokens:
-                middle_text = ' '.join(middle_words[:remaining_tokens-10]) + "... [truncated]"
+            if count_tokens(middle_text) > remaining_tokens:
+                middle_text = truncate_to_tokens(middle_text, remaining_tokens - 10) + "... [truncated]"
             
-            essential_text = '\n'.join(lines[:5]) + '\n\n' + middle_text + '\n\n' + '\n'.join(lines[-3:])
+            essential_text = head + '\n\n' + middle_text + '\n\n' + tail
         
         return essential_text
 
     async def _analyze_circles_coverage(self, prd_content: str) -> Dict[str, Any]:
-        """Analyze how well the PRD covers the CIRCLES framework"""
-        
-        # Enhanced CIRCLES analysis that recognizes comprehensive execution
-        circles_analysis = {
-            'C1_Comprehend': {
-                'name': 'Comprehend the Situation',
-                'keywords': ['problem', 'context', 'background', 'situation', 'challenge', 'current state', 'market'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            },
-            'I_Identify': {
-                'name': 'Identify the Customer',
-                'keywords': ['user', 'customer', 'persona', 'stakeholder', 'target', 'demographics', 'segment'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            },
-            'R_Report': {
-                'name': 'Report Customer Needs',
-                'keywords': ['requirement', 'need', 'feature', 'functionality', 'specification', 'acceptance criteria', 'user story'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            },
-            'C2_Cut': {
-                'name': 'Cut Through Prioritization',
-                'keywords': ['priority', 'must have', 'should have', 'could have', 'prioritization', 'mvp', 'essential'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            },
-            'L_List': {
-                'name': 'List Solutions',
-                'keywords': ['solution', 'approach', 'option', 'alternative', 'implementation', 'design', 'architecture'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            },
-            'E_Evaluate': {
-                'name': 'Evaluate Trade-offs',
-                'keywords': ['trade-off', 'pros', 'cons', 'comparison', 'evaluation', 'risk', 'benefit', 'cost'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            },
-            'S_Summarize': {
-                'name': 'Summarize Recommendations',
-                'keywords': ['recommendation', 'conclusion', 'next steps', 'summary', 'decision', 'action plan', 'timeline'],
-                'covered': False,
-                'coverage_percentage': 0,
-                'found_keywords': []
-            }
-        }
-        
-        content_lower = prd_content.lower()
+        """Analyze how well the PRD covers the CIRCLES framework, reusing the result for a PRD seen recently"""
+        
+        # Error strings echo prompt fragments, so scoring their keywords would only report false coverage
+        if len(prd_content.strip()) < self._MIN_COVERAGE_CHARS:
+            return self._compute_circles_coverage("")
+        
+        cache_key = hashlib.blake2b(prd_content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        cached = self._coverage_cache.get(cache_key)
+        if cached is not None:
+            self._coverage_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached)  # Callers add to the result, so never hand out the cached dict
+        
+        result = self._compute_circles_coverage(prd_content)
+        self._coverage_cache[cache_key] = copy.deepcopy(result)
+        if len(self._coverage_cache) > self._COVERAGE_CACHE_SIZE:
+            self._coverage_cache.popitem(last=False)
+        return result
+
+    def _compute_circles_coverage(self, prd_content: str) -> Dict[str, Any]:
+        """Score the CIRCLES coverage of a PRD from its keywords and structure indicators"""
         
-        # Check for comprehensive CIRCLES execution indicators
-        circles_execution_indicators = [
-            'circles framework', 'circles analysis', 'comprehend the situation',
-            'identify the customer', 'report customer needs', 'cut through prioritization',
-            'list solutions', 'evaluate trade-offs', 'summarize recommendations'
-        ]
+        # Find every step keyword and indicator in a single pass over the document
+        present_terms = _find_keywords(prd_content, self._COVERAGE_TERMS)
         
-        has_circles_execution = any(indicator in content_lower for indicator in circles_execution_indicators)
+        has_circles_execution = any(indicator in present_terms for indicator in self._CIRCLES_EXECUTION_INDICATORS)
         
-        # Enhanced scoring logic
-        for step, step_info in circles_analysis.items():
-            keywords = step_info['keywords']
-            found_keywords = [kw for kw in keywords if kw in content_lower]
-            step_info['found_keywords'] = found_keywords
+        # Enhanced scoring logic; each step's entry is built once from the class-level step definitions
+        circles_analysis = {}
+        for step, name, keywords in self._COVERAGE_STEPS:
+            found_keywords = [kw for kw in keywords if kw in present_terms]
             
             # Base coverage from keyword matching
             base_coverage = (len(found_keywords) / len(keywords)) * 100
@@ -1541,20 +2159,21 @@ Return ONLY the complete PRD document in markdown format. Do not include any exp
             if has_circles_execution:
                 # If CIRCLES framework was executed, give credit for comprehensive analysis
                 boost_factor = 1.5 if len(found_keywords) > 0 else 1.2
-                step_info['coverage_percentage'] = min(100, base_coverage * boost_factor)
-                step_info['covered'] = step_info['coverage_percentage'] > 20  # Lower threshold when CIRCLES executed
+                coverage_percentage = min(100, base_coverage * boost_factor)
+                covered = coverage_percentage > 20  # Lower threshold when CIRCLES executed
             else:
-                step_info['coverage_percentage'] = base_coverage
-                step_info['covered'] = len(found_keywords) > 0
-        
-        # Check for comprehensive PRD structure
-        comprehensive_indicators = [
-            'requirements table', 'personas table', 'stakeholder matrix',
-            'success metrics', 'implementation plan', 'acceptance criteria',
-            'user stories', 'functional requirements', 'non-functional requirements'
-        ]
+                coverage_percentage = base_coverage
+                covered = len(found_keywords) > 0
+            
+            circles_analysis[step] = {
+                'name': name,
+                'keywords': list(keywords),
+                'covered': covered,
+                'coverage_percentage': coverage_percentage,
+                'found_keywords': found_keywords
+            }
         
-        comprehensive_score = sum(1 for indicator in comprehensive_indicators if indicator in content_lower)
+        comprehensive_score = sum(1 for indicator in self._COMPREHENSIVE_INDICATORS if indicator in present_terms)
         comprehensiveness_boost = min(20, comprehensive_score * 2)  # Up to 20% boost
         
         # Calculate overall coverage with boosts
@@ -1579,13 +2198,13 @@ Return ONLY the complete PRD document in markdown format. Do not include any exp
         
         return result
 
-    def get_session(self, session_id: str) -> Optional[PRDSession]:
+    async def get_session(self, session_id: str) -> Optional[PRDSession]:
         """Retrieve a session by ID"""
-        return self.sessions.get(session_id)
+        return await self.session_store.get(session_id)
 
-    def list_sessions(self) -> List[str]:
+    async def list_sessions(self) -> List[str]:
         """List all active session IDs"""
-        return list(self.sessions.keys())
+        return await self.session_store.list_ids()
 
 # Global instance for the hackathon
 _groq_agent_instance = None
@@ -1,8 +1,8 @@
 import streamlit as st
 import asyncio
-import json
 import os
 import io
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 from docx import Document
@@ -11,6 +11,7 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from prd_agent import get_groq_agent, PRDResult
 from utils.template_manager import get_template_manager
 from utils.prd_evaluator import PRDEvaluator
+from utils import fast_json
 
 # Page configuration
 st.set_page_config(
@@ -94,6 +95,10 @@ if 'groq_agent' not in st.session_state:
 if 'template_manager' not in st.session_state:
     st.session_state.template_manager = get_template_manager()
 
+# Kept across reruns so re-analyzing an unchanged document reuses its evaluation
+if 'prd_evaluator' not in st.session_state:
+    st.session_state.prd_evaluator = PRDEvaluator()
+
 if 'session_id' not in st.session_state:
     st.session_state.session_id = None
 
@@ -438,6 +443,25 @@ def _add_table_to_doc(doc, table_rows):
     """Add a table to the document - legacy function, delegates to enhanced version"""
     _add_enhanced_table_to_doc(doc, table_rows)
 
+async def _generate_prd_streaming(agent, preview, **generation_args) -> PRDResult:
+    """Run the agent's streaming generation, rendering the document into preview as it arrives"""
+    chunks = []
+    last_render = 0.0
+    try:
+        async for item in agent.generate_prd_stream(**generation_args):
+            if isinstance(item, PRDResult):
+                return item
+            chunks.append(item)
+            # Every render resends the whole document, so refresh a few times a second rather than per chunk
+            now = time.monotonic()
+            if now - last_render >= 0.25:
+                preview.markdown("".join(chunks))
+                last_render = now
+        raise RuntimeError("BRD generation finished without a result")
+    finally:
+        # asyncio.run ends this loop after the generation, so release the agent's pooled connections first
+        await agent.aclose()
+
 # Header
 st.markdown("""
 <div class="main-header">
@@ -547,6 +571,7 @@ with col1:
             # Create progress display
             progress_container = st.empty()
             status_container = st.empty()
+            preview_container = st.empty()
             
             with st.spinner("Starting CIRCLES Framework Analysis..."):
                 # Show CIRCLES steps
@@ -587,9 +612,11 @@ with col1:
                     # Generate PRD with progress updates
                     status_container.info("⚡ Executing CIRCLES framework with Groq Lightning-Fast AI...")
                     
-                    # Generate PRD
+                    # Generate PRD, showing the document as Groq streams it
                     result = asyncio.run(
-                        st.session_state.groq_agent.generate_prd(
+                        _generate_prd_streaming(
+                            st.session_state.groq_agent,
+                            preview_container,
                             product_idea=product_idea,
                             template_id=selected_template,
                             conversation_data=conversation_data,
@@ -604,6 +631,7 @@ with col1:
                     # Clear progress and show success
                     progress_container.empty()
                     status_container.empty()
+                    preview_container.empty()
                     
                     # Show completion with CIRCLES info
                     st.success("✅ BRD generated successfully using CIRCLES framework!")
@@ -617,6 +645,7 @@ with col1:
                 except Exception as e:
                     progress_container.empty()
                     status_container.empty()
+                    preview_container.empty()
                     st.error(f"Error generating BRD: {str(e)}")
 
 with col2:
@@ -806,8 +835,7 @@ if st.session_state.generated_prd:
         if st.button("🔍 Analyze Document Quality", type="primary"):
             with st.spinner("Analyzing document quality..."):
                 try:
-                    evaluator = PRDEvaluator()
-                    evaluation = evaluator.evaluate_prd_document(st.session_state.generated_prd.prd_document)
+                    evaluation = st.session_state.prd_evaluator.evaluate_prd_document(st.session_state.generated_prd.prd_document)
                     st.session_state.quality_evaluation = evaluation
                 except Exception as e:
                     st.error(f"Error during evaluation: {e}")
@@ -919,7 +947,7 @@ if st.session_state.generated_prd:
             
             st.download_button(
                 label="📊 Download Full Analysis (JSON)",
-                data=json.dumps(full_data, indent=2),
+                data=fast_json.dumps(full_data, pretty=True),
                 file_name=f"BRD_Analysis_Groq_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
                 use_container_width=True
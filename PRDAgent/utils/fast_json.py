@@ -0,0 +1,25 @@
+"""
+JSON Encoding for the Groq PRD Agent
+Uses orjson when it is installed and falls back to the standard library json module otherwise
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """Serialize obj to a compact JSON string, or indented by two spaces when pretty is set"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode("utf-8")
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document, raising ValueError if it is malformed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,7 +1,38 @@
 import os
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Mapping
 
+# Resolved once at import; prompts are read relative to it
+_PROMPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "prompts"))
+
+@lru_cache(maxsize=None)
 def load_prompt(prompt_file: str) -> str:
-    base_path = os.path.join(os.path.dirname(__file__), "..", "prompts")
-    full_path = os.path.abspath(os.path.join(base_path, prompt_file))
+    full_path = os.path.join(_PROMPTS_DIR, prompt_file)
     with open(full_path, "r", encoding="utf-8") as file:
         return file.read()
+
+class CompiledPrompt:
+    """A prompt template with {placeholder} fields parsed once for repeated rendering"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._segments = list(Formatter().parse(source))
+        self.fields = frozenset(field for _, field, _, _ in self._segments if field)
+
+    def render(self, variables: Mapping[str, Any]) -> str:
+        """Substitute variables into the template, equivalent to source.format_map(variables)"""
+        parts = []
+        for literal, field, format_spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = variables[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(format(value, format_spec or ""))
+        return "".join(parts)
@@ -0,0 +1,72 @@
+"""
+Persistent LLM Response Cache for the Groq PRD Agent
+Stores completed Groq responses in SQLite, keyed by a SHA-256 hash of the request
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+class ResponseCache:
+    """Exact-match cache of LLM responses that survives application restarts"""
+
+    def __init__(self, cache_dir: str, max_entries: Optional[int] = None):
+        """Open (or create) the SQLite cache database inside cache_dir
+        
+        When max_entries is set, the oldest responses are dropped once the cache grows past it.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Streamlit reruns scripts on different threads, so share one guarded connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / "responses.sqlite3"), check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str, response_format: Dict[str, str] = None,
+                 budget_hint: str = "") -> str:
+        """Build the cache key for a single chat completion request
+        
+        budget_hint identifies any response budget hint sent along with the prompt.
+        """
+        format_type = response_format.get("type", "") if response_format else ""
+        payload = f"{model}\x00{temperature}\x00{format_type}\x00{budget_hint}\x00{prompt}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Response cache read failed: {e}")
+            return None
+        return row[0] if row else None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response under key, replacing any previous entry"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, time.time())
+                )
+                if self.max_entries is not None:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Response cache write failed: {e}")
@@ -0,0 +1,131 @@
+"""
+Session Storage for the Groq PRD Agent
+Keeps PRD sessions in process memory or in Redis so they can be shared across workers
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Protocol, Tuple, Type
+
+from utils import fast_json
+
+def _import_redis_asyncio() -> Optional[Any]:
+    """Import redis.asyncio on first use; it is slow to import and only the Redis backend needs it"""
+    try:
+        import redis.asyncio as redis_asyncio
+    except ImportError:
+        return None
+    return redis_asyncio
+
+class SessionStore(Protocol):
+    """Interface every session backend implements"""
+
+    async def get(self, session_id: str) -> Optional[Any]:
+        """Return the stored session, or None if it does not exist"""
+        ...
+
+    async def set(self, session_id: str, session: Any) -> None:
+        """Store or replace a session"""
+        ...
+
+    async def list_ids(self) -> List[str]:
+        """Return the IDs of all stored sessions"""
+        ...
+
+    async def evict_older_than(self, timestamp: float) -> int:
+        """Remove sessions last written before timestamp and return how many were removed"""
+        ...
+
+    async def aclose(self) -> None:
+        """Release connections opened on the running event loop"""
+        ...
+
+class InMemorySessionStore:
+    """Process-local session store; sessions are lost on restart and not shared between workers
+
+    At most max_sessions are kept; once full, the least recently used session is dropped.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[Any]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+
+    async def set(self, session_id: str, session: Any) -> None:
+        self._sessions[session_id] = (session, time.time())
+        self._sessions.move_to_end(session_id)
+        if self.max_sessions is not None:
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    async def list_ids(self) -> List[str]:
+        return list(self._sessions.keys())
+
+    async def evict_older_than(self, timestamp: float) -> int:
+        stale_ids = [session_id for session_id, (_, updated_at) in self._sessions.items() if updated_at < timestamp]
+        for session_id in stale_ids:
+            del self._sessions[session_id]
+        return len(stale_ids)
+
+    async def aclose(self) -> None:
+        pass
+
+class RedisSessionStore:
+    """Redis-backed session store; sessions are serialized as JSON and expire through the key TTL
+
+    session_type must provide to_dict() and a from_dict() classmethod.
+    """
+
+    def __init__(self, redis_url: str, session_type: Type[Any], ttl_seconds: int, key_prefix: str = "prd:"):
+        self._redis_asyncio = _import_redis_asyncio()
+        if self._redis_asyncio is None:
+            raise ImportError("The redis package is required for RedisSessionStore")
+
+        self.redis_url = redis_url
+        self.session_type = session_type
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self._client = None
+        self._client_loop = None
+
+    def _get_client(self) -> Any:
+        """Return a client for the running event loop; redis.asyncio connections cannot cross loops"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = self._redis_asyncio.from_url(self.redis_url, decode_responses=True)
+            self._client_loop = loop
+        return self._client
+
+    async def get(self, session_id: str) -> Optional[Any]:
+        raw_session = await self._get_client().get(f"{self.key_prefix}{session_id}")
+        if raw_session is None:
+            return None
+        return self.session_type.from_dict(fast_json.loads(raw_session))
+
+    async def set(self, session_id: str, session: Any) -> None:
+        await self._get_client().setex(
+            f"{self.key_prefix}{session_id}",
+            self.ttl_seconds,
+            fast_json.dumps(session.to_dict())
+        )
+
+    async def list_ids(self) -> List[str]:
+        prefix_length = len(self.key_prefix)
+        return [key[prefix_length:] async for key in self._get_client().scan_iter(match=f"{self.key_prefix}*")]
+
+    async def evict_older_than(self, timestamp: float) -> int:
+        # Redis expires stale sessions itself through the TTL set on every write
+        return 0
+
+    async def aclose(self) -> None:
+        # The client and its pool belong to the loop that opened them, so close them before it ends
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
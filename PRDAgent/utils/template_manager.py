@@ -1,10 +1,201 @@
 """
 Simplified Template Manager for Groq Hackathon Version
 """
-import json
+import logging
 import os
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Sequence, Tuple
 from pathlib import Path
+from utils import fast_json
+
+# Resolved once at import; managers created without a directory read templates from here
+_TEMPLATES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "templates"))
+
+# Built-in templates, shared read-only by every manager; a template file with the same ID replaces one
+_DEFAULT_TEMPLATES: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "standard_template": MappingProxyType({
+        "name": "Standard BRD Template",
+        "description": "Comprehensive business requirements document template suitable for most projects",
+        "category": "general",
+        "sections": (
+            "executive_summary",
+            "problem_statement",
+            "solution_overview",
+            "requirements",
+            "success_criteria",
+            "implementation_plan"
+        )
+    }),
+    "agile_feature_template": MappingProxyType({
+        "name": "Agile Feature Template",
+        "description": "Template optimized for agile development and feature specifications",
+        "category": "agile",
+        "sections": (
+            "feature_overview",
+            "user_stories",
+            "acceptance_criteria",
+            "technical_requirements",
+            "testing_criteria"
+        )
+    }),
+    "mobile_app_template": MappingProxyType({
+        "name": "Mobile App Template",
+        "description": "Specialized template for mobile application requirements",
+        "category": "mobile",
+        "sections": (
+            "app_overview",
+            "user_experience",
+            "functional_requirements",
+            "platform_requirements",
+            "performance_criteria",
+            "security_requirements"
+        )
+    })
+})
+
+_NO_TEMPLATES: Mapping[str, Any] = MappingProxyType({})
+
+# Questions asked for each template section, handed to callers as read-only views
+_SECTION_QUESTIONS: Dict[str, Tuple[Dict[str, Any], ...]] = {
+    "executive_summary": (
+        {
+            "id": "problem_statement",
+            "question": "What is the main problem or challenge you're trying to solve?",
+            "category": "problem_analysis",
+            "required": True
+        },
+        {
+            "id": "solution_overview",
+            "question": "What is your proposed solution in a nutshell?",
+            "category": "solution_design",
+            "required": True
+        },
+    ),
+    "business_case": (
+        {
+            "id": "business_value",
+            "question": "What business value will this solution provide?",
+            "category": "business_analysis",
+            "required": True
+        },
+    ),
+    "stakeholder_analysis": (
+        {
+            "id": "target_users",
+            "question": "Who are your target users or customers?",
+            "category": "user_analysis",
+            "required": True
+        },
+    ),
+    "requirements_specification": (
+        {
+            "id": "functional_requirements",
+            "question": "What are the key functional requirements?",
+            "category": "requirements",
+            "required": True
+        },
+    ),
+    "success_criteria": (
+        {
+            "id": "success_metrics",
+            "question": "How will you measure success?",
+            "category": "metrics",
+            "required": True
+        },
+    ),
+    "implementation_plan": (
+        {
+            "id": "timeline",
+            "question": "What is your expected timeline?",
+            "category": "planning",
+            "required": False
+        },
+    )
+}
+
+# Opening questions used when a template has no section-specific ones
+_DEFAULT_QUESTIONS: Tuple[Dict[str, Any], ...] = (
+    {
+        "id": "product_overview",
+        "question": "What is your product or project about?",
+        "category": "overview",
+        "required": True
+    },
+    {
+        "id": "target_audience",
+        "question": "Who is your target audience?",
+        "category": "users",
+        "required": True
+    },
+    {
+        "id": "main_problem",
+        "question": "What main problem does this solve?",
+        "category": "problem",
+        "required": True
+    },
+    {
+        "id": "key_features",
+        "question": "What are the key features or capabilities?",
+        "category": "features",
+        "required": True
+    },
+    {
+        "id": "success_definition",
+        "question": "How do you define success for this project?",
+        "category": "success",
+        "required": True
+    }
+)
+
+# Extra questions that pad the set out to a reasonable length
+_ADDITIONAL_QUESTIONS: Tuple[Dict[str, Any], ...] = (
+    {
+        "id": "technical_constraints",
+        "question": "Are there any technical constraints or requirements?",
+        "category": "technical",
+        "required": False
+    },
+    {
+        "id": "budget_timeline",
+        "question": "What are your budget and timeline constraints?",
+        "category": "constraints",
+        "required": False
+    },
+    {
+        "id": "competition",
+        "question": "What alternatives or competitors exist?",
+        "category": "competitive",
+        "required": False
+    },
+    {
+        "id": "risks",
+        "question": "What are the main risks or challenges?",
+        "category": "risks",
+        "required": False
+    },
+    {
+        "id": "stakeholders",
+        "question": "Who are the key stakeholders?",
+        "category": "stakeholders",
+        "required": False
+    },
+    {
+        "id": "assumptions",
+        "question": "What key assumptions are you making?",
+        "category": "assumptions",
+        "required": False
+    },
+    {
+        "id": "integration",
+        "question": "What systems or tools need to integrate?",
+        "category": "integration",
+        "required": False
+    }
+)
+
+# Read-only views of the default questions, handed out as-is for unknown templates
+_DEFAULT_QUESTION_VIEWS: Tuple[Mapping[str, Any], ...] = tuple(MappingProxyType(question) for question in _DEFAULT_QUESTIONS)
 
 class GroqTemplateManager:
     """Simplified template manager for hackathon submission"""
@@ -12,79 +203,51 @@ class GroqTemplateManager:
     def __init__(self, templates_dir: str = None):
         """Initialize with templates directory"""
         if templates_dir is None:
-            templates_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
+            templates_dir = _TEMPLATES_DIR
         
         self.templates_dir = Path(templates_dir)
         self.templates = self._load_templates()
-    
-    def _load_templates(self) -> Dict[str, Any]:
-        """Load all templates from the templates directory"""
-        templates = {}
+        self._templates_view = MappingProxyType(self.templates)
         
-        # Default templates
-        default_templates = {
-            "standard_template": {
-                "name": "Standard BRD Template",
-                "description": "Comprehensive business requirements document template suitable for most projects",
-                "category": "general",
-                "sections": [
-                    "executive_summary",
-                    "problem_statement",
-                    "solution_overview",
-                    "requirements",
-                    "success_criteria",
-                    "implementation_plan"
-                ]
-            },
-            "agile_feature_template": {
-                "name": "Agile Feature Template",
-                "description": "Template optimized for agile development and feature specifications",
-                "category": "agile",
-                "sections": [
-                    "feature_overview",
-                    "user_stories",
-                    "acceptance_criteria",
-                    "technical_requirements",
-                    "testing_criteria"
-                ]
-            },
-            "mobile_app_template": {
-                "name": "Mobile App Template",
-                "description": "Specialized template for mobile application requirements",
-                "category": "mobile",
-                "sections": [
-                    "app_overview",
-                    "user_experience",
-                    "functional_requirements",
-                    "platform_requirements",
-                    "performance_criteria",
-                    "security_requirements"
-                ]
-            }
+        # Templates are read-only once loaded, so index names and categories up front
+        self._template_names = tuple(template.get('name', tid) for tid, template in self.templates.items())
+        templates_by_category: Dict[str, Dict[str, Any]] = {}
+        for tid, template in self.templates.items():
+            templates_by_category.setdefault(template.get('category'), {})[tid] = template
+        self._templates_by_category: Dict[str, Mapping[str, Any]] = {
+            category: MappingProxyType(category_templates)
+            for category, category_templates in templates_by_category.items()
         }
         
-        templates.update(default_templates)
+        # Question sets assembled so far, keyed by template ID
+        self._questions_by_template: Dict[str, Tuple[Mapping[str, Any], ...]] = {}
+    
+    def _load_templates(self) -> Dict[str, Any]:
+        """Load all templates from the templates directory"""
+        templates = dict(_DEFAULT_TEMPLATES)
         
         # Load custom templates from files if directory exists
-        if self.templates_dir.exists():
-            for template_file in self.templates_dir.glob("*.json"):
-                try:
-                    # Skip configuration files
-                    if template_file.stem in ['template_config'] or template_file.stem.endswith('_config'):
+        if self.templates_dir.is_dir():
+            with os.scandir(self.templates_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json') or not entry.is_file():
                         continue
+                    try:
+                        # Skip configuration files, template_config.json included
+                        template_id = entry.name[:-len('.json')]
+                        if template_id.endswith('_config'):
+                            continue
                         
-                    with open(template_file, 'r', encoding='utf-8') as f:
-                        template_data = json.load(f)
-                        template_id = template_file.stem
-                        templates[template_id] = template_data
-                except Exception as e:
-                    print(f"Warning: Could not load template {template_file}: {e}")
+                        with open(entry.path, 'rb') as f:
+                            templates[template_id] = fast_json.loads(f.read())
+                    except Exception as e:
+                        logging.warning(f"Could not load template {entry.path}: {e}")
         
         return templates
     
-    def list_templates(self) -> Dict[str, Any]:
-        """Get all available templates"""
-        return self.templates.copy()
+    def list_templates(self) -> Mapping[str, Any]:
+        """Get a read-only view of all available templates"""
+        return self._templates_view
     
     def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific template by ID"""
@@ -92,183 +255,48 @@ class GroqTemplateManager:
     
     def get_template_names(self) -> List[str]:
         """Get list of template names"""
-        return [template.get('name', tid) for tid, template in self.templates.items()]
+        return list(self._template_names)
     
-    def get_template_by_category(self, category: str) -> Dict[str, Any]:
-        """Get templates filtered by category"""
-        return {
-            tid: template for tid, template in self.templates.items()
-            if template.get('category') == category
-        }
+    def get_template_by_category(self, category: str) -> Mapping[str, Any]:
+        """Get a read-only view of the templates in a category"""
+        return self._templates_by_category.get(category, _NO_TEMPLATES)
     
-    def generate_questions(self, template_id: str) -> List[Dict[str, Any]]:
-        """Generate questions for a specific template"""
+    def generate_questions(self, template_id: str) -> Sequence[Mapping[str, Any]]:
+        """Generate questions for a specific template
+        
+        The questions are shared read-only views; copy them before making changes.
+        """
         template = self.get_template(template_id)
         if not template:
-            return self._get_default_questions()
+            return _DEFAULT_QUESTION_VIEWS
+        
+        # Templates do not change once loaded, so each template's questions are assembled only once
+        questions = self._questions_by_template.get(template_id)
+        if questions is None:
+            questions = self._questions_by_template[template_id] = self._assemble_questions(template)
         
+        return questions
+    
+    def _assemble_questions(self, template: Mapping[str, Any]) -> Tuple[Mapping[str, Any], ...]:
+        """Select a template's questions from the shared question banks"""
         # Generate questions based on template sections
         questions = []
-        section_questions = {
-            "executive_summary": [
-                {
-                    "id": "problem_statement",
-                    "question": "What is the main problem or challenge you're trying to solve?",
-                    "category": "problem_analysis",
-                    "required": True
-                },
-                {
-                    "id": "solution_overview",
-                    "question": "What is your proposed solution in a nutshell?",
-                    "category": "solution_design",
-                    "required": True
-                }
-            ],
-            "business_case": [
-                {
-                    "id": "business_value",
-                    "question": "What business value will this solution provide?",
-                    "category": "business_analysis",
-                    "required": True
-                }
-            ],
-            "stakeholder_analysis": [
-                {
-                    "id": "target_users",
-                    "question": "Who are your target users or customers?",
-                    "category": "user_analysis",
-                    "required": True
-                }
-            ],
-            "requirements_specification": [
-                {
-                    "id": "functional_requirements",
-                    "question": "What are the key functional requirements?",
-                    "category": "requirements",
-                    "required": True
-                }
-            ],
-            "success_criteria": [
-                {
-                    "id": "success_metrics",
-                    "question": "How will you measure success?",
-                    "category": "metrics",
-                    "required": True
-                }
-            ],
-            "implementation_plan": [
-                {
-                    "id": "timeline",
-                    "question": "What is your expected timeline?",
-                    "category": "planning",
-                    "required": False
-                }
-            ]
-        }
-        
-        # Add questions based on template sections
         for section in template.get('sections', []):
-            if section in section_questions:
-                questions.extend(section_questions[section])
+            questions.extend(_SECTION_QUESTIONS.get(section, ()))
         
         # Add default questions if none found
         if not questions:
-            questions = self._get_default_questions()
+            questions = list(_DEFAULT_QUESTIONS)
         
-        # Ensure we have a reasonable number of questions
-        while len(questions) < 8:
-            questions.extend(self._get_additional_questions()[:8 - len(questions)])
+        # Ensure we have a reasonable number of questions; the list is never empty here, so the
+        # additional questions always cover the shortfall in one pass
+        shortfall = 8 - len(questions)
+        if shortfall > 0:
+            questions.extend(_ADDITIONAL_QUESTIONS[:shortfall])
         
-        return questions[:12]  # Limit to 12 questions
-    
-    def _get_default_questions(self) -> List[Dict[str, Any]]:
-        """Get default questions for any template"""
-        return [
-            {
-                "id": "product_overview",
-                "question": "What is your product or project about?",
-                "category": "overview",
-                "required": True
-            },
-            {
-                "id": "target_audience",
-                "question": "Who is your target audience?",
-                "category": "users",
-                "required": True
-            },
-            {
-                "id": "main_problem",
-                "question": "What main problem does this solve?",
-                "category": "problem",
-                "required": True
-            },
-            {
-                "id": "key_features",
-                "question": "What are the key features or capabilities?",
-                "category": "features",
-                "required": True
-            },
-            {
-                "id": "success_definition",
-                "question": "How do you define success for this project?",
-                "category": "success",
-                "required": True
-            }
-        ]
-    
-    def _get_additional_questions(self) -> List[Dict[str, Any]]:
-        """Get additional questions to fill out the set"""
-        return [
-            {
-                "id": "technical_constraints",
-                "question": "Are there any technical constraints or requirements?",
-                "category": "technical",
-                "required": False
-            },
-            {
-                "id": "budget_timeline",
-                "question": "What are your budget and timeline constraints?",
-                "category": "constraints",
-                "required": False
-            },
-            {
-                "id": "competition",
-                "question": "What alternatives or competitors exist?",
-                "category": "competitive",
-                "required": False
-            },
-            {
-                "id": "risks",
-                "question": "What are the main risks or challenges?",
-                "category": "risks",
-                "required": False
-            },
-            {
-                "id": "stakeholders",
-                "question": "Who are the key stakeholders?",
-                "category": "stakeholders",
-                "required": False
-            },
-            {
-                "id": "assumptions",
-                "question": "What key assumptions are you making?",
-                "category": "assumptions",
-                "required": False
-            },
-            {
-                "id": "integration",
-                "question": "What systems or tools need to integrate?",
-                "category": "integration",
-                "required": False
-            }
-        ]
-
-# Global instance
-_template_manager_instance = None
+        return tuple(MappingProxyType(question) for question in questions[:12])  # Limit to 12 questions
 
+@lru_cache(maxsize=1)
 def get_template_manager() -> GroqTemplateManager:
     """Get the global template manager instance"""
-    global _template_manager_instance
-    if _template_manager_instance is None:
-        _template_manager_instance = GroqTemplateManager()
-    return _template_manager_instance
+    return GroqTemplateManager()
@@ -0,0 +1,49 @@
+"""
+Token Counting for the Groq PRD Agent
+Uses tiktoken when it is installed and falls back to a word-based estimate otherwise
+"""
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Groq does not publish its Llama tokenizer for tiktoken; cl100k_base tracks it closely enough for budgeting
+ENCODING_NAME = "cl100k_base"
+
+# Multiplier used by the word-based estimate when tiktoken is unavailable
+WORDS_TO_TOKENS = 1.3
+
+@lru_cache(maxsize=None)
+def _get_encoding() -> Optional[Any]:
+    """Load the tokenizer once, or return None if tiktoken cannot be used"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception as e:
+        logging.warning(f"Could not load tokenizer {ENCODING_NAME}, estimating tokens from words: {e}")
+        return None
+
+@lru_cache(maxsize=1024)
+def count_tokens(text: str) -> int:
+    """Count the tokens in text; results are cached so unchanged prompt sections are only tokenized once"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return int(len(text.split()) * WORDS_TO_TOKENS)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Return the longest prefix of text that fits in max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        words = text.split()
+        max_words = int(max_tokens / WORDS_TO_TOKENS)
+        return text if len(words) <= max_words else ' '.join(words[:max_words])
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
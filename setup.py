@@ -15,13 +15,21 @@ def check_python_version():
     print(f"✅ Python {sys.version.split()[0]} detected")
 
 def install_dependencies():
-    """Install required dependencies"""
+    """Install required dependencies
+    
+    A fully pinned, hashed requirements.lock (pip-compile --generate-hashes requirements.txt
+    -o requirements.lock) is installed as-is, skipping pip's dependency resolution; otherwise
+    requirements.txt is resolved normally.
+    """
     print("📦 Installing dependencies...")
     
+    if Path("requirements.lock").exists():
+        pip_args = ["install", "--no-deps", "--require-hashes", "-r", "requirements.lock"]
+    else:
+        pip_args = ["install", "-r", "requirements.txt"]
+    
     try:
-        subprocess.check_call([
-            sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
-        ])
+        subprocess.check_call([sys.executable, "-m", "pip", *pip_args])
         print("✅ Dependencies installed successfully")
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to install dependencies: {e}")